@@ -4,146 +4,196 @@ OpenClaw Dashboard API
 Provides JSON endpoints for real data integration
 """
 
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import os
-import re
-from datetime import datetime
-import subprocess
+
+from api_collectors import (collect_positions, collect_system, collect_cron,
+                            collect_dashboard, history_payload, list_payload,
+                            detail_payload, LISTS)
+from api_snapshot import SnapshotRefresher, etag_matches
+from metrics import MetricsPage, single_flight_family
+from single_flight import SingleFlight
+from snapshot_output import encode_json
 
 app = Flask(__name__)
 CORS(app)  # Allow requests from GitHub Pages
 
-WORKSPACE = r"C:\Users\kanaw\.openclaw\workspace"
+# Section name -> (collector, refresh interval in seconds[, split]).
+# Requests are answered from the latest in-memory snapshot, so collector
+# cost never shows up in request latency. 'dashboard' is split into one
+# section per top-level key of data.json ('dashboard.positions', ...)
+SECTIONS = {
+    'positions': (collect_positions, 5),
+    'system': (collect_system, 300),
+    'cron': (collect_cron, 30),
+    'dashboard': (collect_dashboard, 1, True),
+}
+
+# How long a request waits for a section's first collection after startup
+FIRST_COLLECTION_TIMEOUT = 30
+
+refresher = SnapshotRefresher(SECTIONS)
+
+def section_snapshot(name):
+    """The current snapshot, once it has the section (or after a timeout)"""
+    # Started on first use, so the debug reloader's parent process
+    # doesn't run collectors too
+    refresher.start()
+    snapshot = refresher.current()
+    if snapshot.get(name) is None:
+        snapshot = refresher.wait_for(name, FIRST_COLLECTION_TIMEOUT)
+    return snapshot
+
+def serve_section(name):
+    """Response with the section's payload from the current snapshot"""
+    snapshot = section_snapshot(name)
+    body, coding = snapshot.encoded(name, request.headers.get('Accept-Encoding'))
+    if body is None:
+        return jsonify({"error": f"{name} has not been collected yet"}), 503
+    headers = {
+        'ETag': refresher.etag(snapshot, name, coding),
+        'Vary': 'Accept-Encoding',
+        # Cacheable, but revalidated (cheaply, via If-None-Match) every time
+        'Cache-Control': 'no-cache',
+    }
+    if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+        return Response(status=304, headers=headers)
+    if coding:
+        headers['Content-Encoding'] = coding
+    return Response(body, mimetype='application/json', headers=headers)
 
 @app.route('/api/positions', methods=['GET'])
 def get_positions():
-    """Parse trades.md for open positions"""
-    try:
-        trades_file = os.path.join(WORKSPACE, "memory", "trades.md")
-        if not os.path.exists(trades_file):
-            return jsonify({"positions": [], "error": "trades.md not found"})
-        
-        with open(trades_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        positions = []
-        current_pos = None
-        
-        for line in content.split('\n'):
-            if line.startswith('## OPEN:'):
-                # New position
-                match = re.match(r'## OPEN: (\w+) (LONG|SHORT)', line)
-                if match:
-                    if current_pos:
-                        positions.append(current_pos)
-                    current_pos = {
-                        'coin': match.group(1),
-                        'direction': match.group(2),
-                        'size': None,
-                        'entry': None,
-                        'sl': None,
-                        'tp': None,
-                        'strategy': None
-                    }
-            elif current_pos and line.startswith('- **'):
-                # Parse position details
-                if 'Strategy:' in line:
-                    current_pos['strategy'] = line.split('**')[1].strip()
-                elif 'Size:' in line:
-                    size_str = line.split('**')[2].strip()
-                    try:
-                        current_pos['size'] = float(size_str)
-                    except:
-                        pass
-                elif 'Entry:' in line:
-                    entry_str = line.split('$')[1].strip()
-                    try:
-                        current_pos['entry'] = float(entry_str)
-                    except:
-                        pass
-                elif 'Stop Loss:' in line:
-                    sl_str = line.split('$')[1].strip()
-                    try:
-                        current_pos['sl'] = float(sl_str)
-                    except:
-                        pass
-                elif 'Take Profit:' in line:
-                    tp_str = line.split('$')[1].strip()
-                    try:
-                        current_pos['tp'] = float(tp_str)
-                    except:
-                        pass
-        
-        if current_pos:
-            positions.append(current_pos)
-        
-        return jsonify({
-            "positions": positions,
-            "count": len(positions),
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        return jsonify({"error": str(e), "positions": []})
+    """Open positions from trades.md (?fields=&filter=&sort=&limit=&cursor=)"""
+    if not request.args:
+        return serve_section('positions')
+    return serve_list('positions')
+
+@app.route('/api/positions/<item_id>', methods=['GET'])
+def get_position(item_id):
+    """One open position"""
+    return serve_detail('positions', item_id)
+
+@app.route('/api/bots', methods=['GET'])
+def get_bots():
+    """Bot summary rows from data.json (?fields=&filter=status=error&sort=&limit=)"""
+    return serve_list('bots')
+
+@app.route('/api/bots/<item_id>', methods=['GET'])
+def get_bot(item_id):
+    """Every field of one bot, by id (or name)"""
+    return serve_detail('bots', item_id)
+
+@app.route('/api/sessions', methods=['GET'])
+def get_sessions():
+    """Session summary rows from data.json (?fields=&filter=&sort=-tokens&limit=)"""
+    return serve_list('sessions')
+
+@app.route('/api/sessions/<path:item_id>', methods=['GET'])
+def get_session(item_id):
+    """Every field of one session, by sessionKey"""
+    return serve_detail('sessions', item_id)
 
 @app.route('/api/system', methods=['GET'])
 def get_system_health():
     """Get system health metrics"""
-    try:
-        # Calculate workspace size
-        workspace_size = get_folder_size(WORKSPACE) / (1024 * 1024)  # MB
-        data_size = get_folder_size(os.path.join(WORKSPACE, "data")) / (1024 * 1024)  # MB
-        
-        return jsonify({
-            "workspace_size_mb": round(workspace_size, 2),
-            "data_size_mb": round(data_size, 2),
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        return jsonify({"error": str(e)})
+    return serve_section('system')
 
 @app.route('/api/cron', methods=['GET'])
 def get_cron_status():
     """Get OpenClaw cron job status"""
-    try:
-        # Run openclaw cron list
-        result = subprocess.run(
-            ['openclaw', 'cron', 'list'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode != 0:
-            return jsonify({"error": "openclaw cron list failed", "bots": []})
-        
-        # Parse output (you'll need to adapt this to actual format)
-        bots = []
-        # TODO: Parse openclaw cron list output
-        
-        return jsonify({
-            "bots": bots,
-            "count": len(bots),
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        return jsonify({"error": str(e), "bots": []})
-
-def get_folder_size(folder):
-    """Calculate folder size in bytes"""
-    total_size = 0
-    try:
-        for dirpath, dirnames, filenames in os.walk(folder):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
-    except:
-        pass
-    return total_size
+    return serve_section('cron')
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+def stream_events(last_event_id, prefix):
+    """SSE messages for one client: missed or current state, then changes.
+
+    Each message is built from the newest snapshot when the client is
+    ready for it, so a slow client skips straight to the latest state of
+    each section rather than queueing every intermediate version.
+    """
+    yield b'retry: 3000\n\n'
+    version, messages = refresher.resume_events(last_event_id, prefix)
+    yield from messages
+
+    while True:
+        snapshot = refresher.wait_newer(version, HEARTBEAT_INTERVAL)
+        if snapshot.version == version:
+            yield b': heartbeat\n\n'
+            continue
+        yield from refresher.change_events(snapshot, version, prefix)
+        version = snapshot.version
+
+@app.route('/api/stream', methods=['GET'])
+def stream():
+    """Server-Sent Events: one message per section change (?sections=dashboard)"""
+    refresher.start()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    prefix = request.args.get('sections', '')
+    return Response(stream_events(last_event_id, prefix), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Keep reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no',
+    })
+
+# Seconds identical /api/history requests share one query and its JSON
+HISTORY_TTL = 2
+
+# Section endpoints are already one computation per refresh interval no
+# matter how many clients ask; per-request work (history queries, list
+# pages) goes through here
+flight = SingleFlight(HISTORY_TTL)
+
+def history_response(args):
+    payload, status = history_payload(args)
+    return encode_json(payload), status
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    """Metric history from generate_data.py, e.g. ?metric=dailyPnl&range=7d"""
+    args = request.args.to_dict()
+    key = ('history',) + tuple(sorted(args.items()))
+    body, status = flight.do(key, lambda: history_response(args))
+    return Response(body, status=status, mimetype='application/json')
+
+def serve_list(name):
+    """A page of a list endpoint, computed once per section version and query"""
+    section = LISTS[name][0]
+    snapshot = section_snapshot(section)
+    if snapshot.get(section) is None:
+        return jsonify({"error": f"{section} has not been collected yet"}), 503
+    args = request.args.to_dict()
+    key = (name, snapshot.versions[section]) + tuple(sorted(args.items()))
+    def compute():
+        payload, status = list_payload(name, snapshot.get(section), args)
+        return encode_json(payload), status
+    body, status = flight.do(key, compute)
+    return Response(body, status=status, mimetype='application/json')
+
+def serve_detail(name, item_id):
+    section = LISTS[name][0]
+    snapshot = section_snapshot(section)
+    if snapshot.get(section) is None:
+        return jsonify({"error": f"{section} has not been collected yet"}), 503
+    payload, status = detail_payload(name, snapshot.get(section), item_id)
+    return jsonify(payload), status
+
+@app.route('/api/coalescing', methods=['GET'])
+def get_coalescing():
+    """Single-flight counters per resource: computed / coalesced / cached"""
+    return jsonify(flight.stats())
+
+metrics_page = MetricsPage()
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text format: collector histograms and the snapshot's gauges"""
+    refresher.start()
+    body = metrics_page.render_snapshot(refresher.current(), refresher.metrics,
+                                        [single_flight_family(flight.stats())])
+    return Response(body, mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     print("OpenClaw Dashboard API")
@@ -152,7 +202,14 @@ if __name__ == '__main__':
     print()
     print("Endpoints:")
     print("  GET /api/positions - Trading positions from trades.md")
+    print("  GET /api/bots      - Bot summaries (?filter=status=error&sort=name&limit=20)")
+    print("  GET /api/sessions  - Session summaries (?sort=-tokens&fields=name,tokens)")
+    print("  GET /api/<list>/<id> - One position, bot or session with every field")
     print("  GET /api/system    - System health metrics")
     print("  GET /api/cron      - Cron job status")
+    print("  GET /api/history   - Metric history (?metric=dailyPnl&range=7d)")
+    print("  GET /api/stream    - Server-Sent Events of section changes")
+    print("  GET /api/coalescing - Request coalescing counters")
+    print("  GET /metrics       - Prometheus metrics")
     print()
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Dashboard API (asyncio/ASGI variant)
+
+Same routes and response shapes as api.py, served from one event loop:
+
+- `openclaw cron list` runs through asyncio.create_subprocess_exec, so a
+  slow CLI call never holds a worker
+- filesystem and SQLite work (os.walk, trades.md, data.json, history.db)
+  runs on a small bounded thread pool
+- every /api/stream client is a coroutine waiting on one shared event
+  that is set when a new snapshot is published, so hundreds of idle
+  streams cost a few KB each and no threads
+
+    pip install uvicorn
+    python api_async.py            (or: uvicorn api_async:app --port 5000)
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from api_collectors import (collect_positions, collect_system, collect_dashboard,
+                            cron_payload, history_payload, list_payload, detail_payload,
+                            LISTS, CRON_COMMAND, CRON_TIMEOUT)
+from api_snapshot import SnapshotRefresher, etag_matches, reports_error
+from metrics import MetricsPage, single_flight_family
+from single_flight import AsyncSingleFlight
+from snapshot_output import encode_json
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+# Threads for blocking filesystem/SQLite work; caps how much of it runs at once
+FS_WORKERS = 4
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# How long a request waits for a section's first collection after startup
+FIRST_COLLECTION_TIMEOUT = 30
+
+# Seconds identical /api/history requests share one query and its JSON
+HISTORY_TTL = 2
+
+async def collect_cron():
+    """OpenClaw cron job status"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *CRON_COMMAND,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), CRON_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return {"error": f"openclaw cron list timed out after {CRON_TIMEOUT} seconds", "bots": []}
+        return cron_payload(proc.returncode, stdout.decode('utf-8', errors='replace'))
+
+    except Exception as e:
+        return {"error": str(e), "bots": []}
+
+# Same sections and intervals as api.py; collect_cron is a coroutine here
+SECTIONS = {
+    'positions': (collect_positions, 5),
+    'system': (collect_system, 300),
+    'cron': (collect_cron, 30),
+    'dashboard': (collect_dashboard, 1, True),
+}
+
+class AsyncRefresher:
+    """Runs the section collectors as asyncio tasks.
+
+    Snapshots, versions and the replay buffer live in a SnapshotRefresher
+    whose own thread is never started. Waiters share one asyncio.Event,
+    which is set and replaced every time a new snapshot is published.
+    """
+
+    def __init__(self, sections, workers=FS_WORKERS):
+        self.sections = sections
+        self.state = SnapshotRefresher(sections)
+        self.workers = workers
+        self.pool = None
+        self.tasks = []
+        self.changed = None
+
+    @property
+    def boot(self):
+        return self.state.boot
+
+    def start(self):
+        """Start one collection loop per section (once, on the running loop)"""
+        if self.tasks:
+            return
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='api-fs')
+        self.changed = asyncio.Event()
+        self.tasks = [asyncio.ensure_future(self.run(name)) for name in self.sections]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def current(self):
+        return self.state.current()
+
+    async def offload(self, fn, *args):
+        """Run a blocking call on the bounded pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def collect(self, name):
+        collector = self.sections[name][0]
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(collector):
+                payload = await collector()
+            else:
+                payload = await self.offload(collector)
+        except Exception as e:
+            self.state.metrics.observe(name, time.perf_counter() - started, ok=False)
+            print(f"[WARN] {name} refresh failed: {e}")
+            return
+        self.state.metrics.observe(name, time.perf_counter() - started, ok=not reports_error(payload))
+        version = self.state.current().version
+        self.state.publish_result(name, payload)
+        if self.state.current().version != version:
+            # Wake every waiter, and give later ones a fresh event
+            self.changed.set()
+            self.changed = asyncio.Event()
+
+    async def run(self, name):
+        interval = self.sections[name][1]
+        while True:
+            started = time.monotonic()
+            await self.collect(name)
+            await asyncio.sleep(max(0, interval - (time.monotonic() - started)))
+
+    async def wait_changed(self, timeout=None):
+        """Wait for the next published snapshot; False on timeout"""
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait_for(self, name, timeout):
+        """The latest snapshot once it has section name (or after timeout)"""
+        deadline = time.monotonic() + timeout
+        while name not in self.current().sections:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await self.wait_changed(remaining):
+                break
+        return self.current()
+
+refresher = AsyncRefresher(SECTIONS)
+metrics_page = MetricsPage()
+# Per-request work (history queries, list pages) shared by identical
+# concurrent requests, as in api.py
+flight = AsyncSingleFlight(HISTORY_TTL)
+
+def cors_headers(extra=()):
+    return [(b'access-control-allow-origin', b'*'), *extra]
+
+async def send_body(send, status, body, content_type=b'application/json', headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': cors_headers([(b'content-type', content_type),
+                                 (b'content-length', str(len(body)).encode('ascii')),
+                                 *headers]),
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def send_json(send, payload, status=200):
+    await send_body(send, status, json.dumps(payload).encode('utf-8'))
+
+async def section_snapshot(name):
+    """The current snapshot, once it has the section (or after a timeout)"""
+    snapshot = refresher.current()
+    if snapshot.get(name) is None:
+        snapshot = await refresher.wait_for(name, FIRST_COLLECTION_TIMEOUT)
+    return snapshot
+
+async def serve_section(send, name, headers):
+    """Response with the section's payload from the current snapshot"""
+    snapshot = await section_snapshot(name)
+    accept_encoding = headers.get(b'accept-encoding', b'').decode('latin-1')
+    body, coding = snapshot.encoded(name, accept_encoding)
+    if body is None:
+        await send_json(send, {"error": f"{name} has not been collected yet"}, 503)
+        return
+    etag = refresher.state.etag(snapshot, name, coding)
+    extra = [(b'etag', etag.encode('ascii')), (b'vary', b'Accept-Encoding'),
+             (b'cache-control', b'no-cache')]
+    if etag_matches(headers.get(b'if-none-match', b'').decode('latin-1'), etag):
+        await send({'type': 'http.response.start', 'status': 304, 'headers': cors_headers(extra)})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if coding:
+        extra.append((b'content-encoding', coding.encode('ascii')))
+    await send_body(send, 200, body, headers=extra)
+
+async def serve_list(send, name, args, item_id=None):
+    """A page of a list endpoint, or one item of it with every field"""
+    section = LISTS[name][0]
+    snapshot = await section_snapshot(section)
+    if snapshot.get(section) is None:
+        await send_json(send, {"error": f"{section} has not been collected yet"}, 503)
+        return
+    if item_id is None:
+        # Computed once per section version and query, as in api.py
+        key = (name, snapshot.versions[section]) + tuple(sorted(args.items()))
+        async def compute():
+            payload, status = list_payload(name, snapshot.get(section), args)
+            return encode_json(payload), status
+        body, status = await flight.do(key, compute)
+        await send_body(send, status, body)
+    else:
+        payload, status = detail_payload(name, snapshot.get(section), item_id)
+        await send_json(send, payload, status)
+
+def history_response(args):
+    payload, status = history_payload(args)
+    return encode_json(payload), status
+
+async def serve_history(send, args):
+    """Metric history, one query per distinct request in flight or in the last HISTORY_TTL"""
+    key = ('history',) + tuple(sorted(args.items()))
+    body, status = await flight.do(key, lambda: refresher.offload(history_response, args))
+    await send_body(send, status, body)
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+async def stream(send, receive, args, headers):
+    """Server-Sent Events: one message per section change (?sections=dashboard)"""
+    last_event_id = headers.get(b'last-event-id', b'').decode('latin-1') or args.get('lastEventId')
+    prefix = args.get('sections', '')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': cors_headers([
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Keep reverse proxies from buffering the stream
+            (b'x-accel-buffering', b'no'),
+        ]),
+    })
+
+    async def push(*chunks):
+        await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+
+    version, messages = refresher.state.resume_events(last_event_id, prefix)
+    await push(b'retry: 3000\n\n', *messages)
+
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        while True:
+            if refresher.current().version == version:
+                changed = asyncio.ensure_future(refresher.changed.wait())
+                done, _ = await asyncio.wait({disconnected, changed}, timeout=HEARTBEAT_INTERVAL,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    changed.cancel()
+                    return
+                if changed not in done:
+                    changed.cancel()
+                    await push(b': heartbeat\n\n')
+                    continue
+            # Built from the newest snapshot, so a client that fell behind
+            # skips to the latest state of each section
+            snapshot = refresher.current()
+            messages = refresher.state.change_events(snapshot, version, prefix)
+            if messages:
+                await push(*messages)
+            version = snapshot.version
+    finally:
+        disconnected.cancel()
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            refresher.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await refresher.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    # Also started here for servers that don't send lifespan events
+    refresher.start()
+    path, method = scope['path'], scope['method']
+    headers = dict(scope['headers'])
+    args = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+
+    if method == 'OPTIONS':
+        # CORS preflight (e.g. for a Last-Event-ID header)
+        await send_body(send, 204, b'', headers=[
+            (b'access-control-allow-methods', b'GET, OPTIONS'),
+            (b'access-control-allow-headers', headers.get(b'access-control-request-headers', b'*')),
+        ])
+        return
+    if method not in ('GET', 'HEAD'):
+        await send_json(send, {"error": "method not allowed"}, 405)
+        return
+
+    name, _, item_id = path[len('/api/'):].partition('/')
+    if path == '/api/positions' and not args:
+        await serve_section(send, 'positions', headers)
+    elif path.startswith('/api/') and name in LISTS:
+        await serve_list(send, name, args, item_id or None)
+    elif path == '/api/system':
+        await serve_section(send, 'system', headers)
+    elif path == '/api/cron':
+        await serve_section(send, 'cron', headers)
+    elif path == '/api/history':
+        await serve_history(send, args)
+    elif path == '/api/coalescing':
+        await send_json(send, flight.stats())
+    elif path == '/api/stream':
+        await stream(send, receive, args, headers)
+    elif path == '/metrics':
+        body = metrics_page.render_snapshot(refresher.current(), refresher.state.metrics,
+                                            [single_flight_family(flight.stats())])
+        await send_body(send, 200, body, content_type=b'text/plain; version=0.0.4')
+    else:
+        await send_json(send, {"error": "not found"}, 404)
+
+if __name__ == '__main__':
+    if uvicorn is None:
+        print("[WARN] uvicorn not installed: pip install uvicorn (or run any ASGI server on api_async:app)")
+    else:
+        print("OpenClaw Dashboard API (asyncio)")
+        print("================================")
+        print("Starting server on http://localhost:5000")
+        print()
+        print("Endpoints:")
+        print("  GET /api/positions - Trading positions from trades.md")
+        print("  GET /api/bots      - Bot summaries (?filter=status=error&sort=name&limit=20)")
+        print("  GET /api/sessions  - Session summaries (?sort=-tokens&fields=name,tokens)")
+        print("  GET /api/<list>/<id> - One position, bot or session with every field")
+        print("  GET /api/system    - System health metrics")
+        print("  GET /api/cron      - Cron job status")
+        print("  GET /api/history   - Metric history (?metric=dailyPnl&range=7d)")
+        print("  GET /api/stream    - Server-Sent Events of section changes")
+        print("  GET /api/coalescing - Request coalescing counters")
+        print("  GET /metrics       - Prometheus metrics")
+        print()
+        uvicorn.run(app, host='0.0.0.0', port=5000, log_level='warning')
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Section collectors shared by api.py (Flask) and api_async.py (asyncio)
+
+Each collector returns the full JSON payload of one endpoint, in the
+shapes api.py has always served.
+"""
+
+import json
+import os
+import re
+import time
+from datetime import datetime
+import subprocess
+
+import workspace_paths
+from folder_index import FolderIndex
+from history_store import HistoryStore
+from list_query import QueryError, query_rows, find_row
+from trade_journal import TradesJournal
+
+WORKSPACE = workspace_paths.WORKSPACE
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "history.db")
+# Snapshot written by generate_data.py, streamed section by section
+DATA_FILE = os.path.join(os.path.dirname(__file__), "data.json")
+# The API's own workspace size index; generate_data.py's folder_index.json
+# has a writer already
+FOLDER_INDEX_FILE = os.path.join(os.path.dirname(__file__), "api_folder_index.json")
+
+RANGE_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+# List endpoint -> (snapshot section, key of the rows in the section's
+# payload or None if the payload is the list itself, row id, fields of a
+# list row or None for all of them; the detail endpoint has every field)
+LISTS = {
+    'positions': ('positions', 'positions', lambda p: p.get('id'), None),
+    'bots': ('dashboard.bots', None, lambda b: b.get('id') or b.get('name'),
+             ['id', 'name', 'status', 'interval', 'lastRun', 'nextRun',
+              'lastRunAt', 'nextRunAt', 'errors']),
+    'sessions': ('dashboard.sessions', None, lambda s: s.get('sessionKey'),
+                 ['sessionKey', 'name', 'channel', 'model', 'tokens',
+                  'lastActive', 'lastActiveAt']),
+}
+
+CRON_COMMAND = ['openclaw', 'cron', 'list']
+CRON_TIMEOUT = 10
+
+_history = None
+_journal = None
+_dashboard = (None, {})
+_folder_index = None
+
+def collect_positions():
+    """Open positions from trades.md"""
+    try:
+        trades_file = workspace_paths.trades_path(WORKSPACE)
+        if not os.path.exists(trades_file):
+            return {"positions": [], "error": "trades.md not found"}
+        
+        # Same incremental parser as generate_data.py
+        global _journal
+        if _journal is None:
+            _journal = TradesJournal(trades_file)
+        positions = _journal.refresh()
+        
+        return {
+            "positions": positions,
+            "count": len(positions),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    except Exception as e:
+        return {"error": str(e), "positions": []}
+
+def collect_system():
+    """System health metrics"""
+    try:
+        global _folder_index
+        if _folder_index is None:
+            _folder_index = FolderIndex(WORKSPACE, FOLDER_INDEX_FILE)
+        # Only directories whose mtime changed are re-scanned; the data
+        # folder is a subtree of the workspace, so no second walk
+        _folder_index.refresh()
+        workspace_size = _folder_index.size() / (1024 * 1024)  # MB
+        data_size = _folder_index.size(os.path.join(WORKSPACE, "data")) / (1024 * 1024)  # MB
+        
+        return {
+            "workspace_size_mb": round(workspace_size, 2),
+            "data_size_mb": round(data_size, 2),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    except Exception as e:
+        return {"error": str(e)}
+
+def cron_payload(returncode, stdout):
+    """/api/cron payload from the result of `openclaw cron list`"""
+    if returncode != 0:
+        return {"error": "openclaw cron list failed", "bots": []}
+    
+    # Parse output (you'll need to adapt this to actual format)
+    bots = []
+    # TODO: Parse openclaw cron list output
+    
+    return {
+        "bots": bots,
+        "count": len(bots),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def collect_cron():
+    """OpenClaw cron job status"""
+    try:
+        # Run openclaw cron list
+        result = subprocess.run(
+            CRON_COMMAND,
+            capture_output=True,
+            text=True,
+            timeout=CRON_TIMEOUT
+        )
+        return cron_payload(result.returncode, result.stdout)
+    
+    except Exception as e:
+        return {"error": str(e), "bots": []}
+
+def collect_dashboard():
+    """Top-level sections of data.json, re-read only when the file changes"""
+    global _dashboard
+    try:
+        st = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return {}
+    stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+    if stat_key != _dashboard[0]:
+        with open(DATA_FILE, 'r', encoding='utf-8') as f:
+            _dashboard = (stat_key, json.load(f))
+    return _dashboard[1]
+
+def history_payload(args):
+    """(payload, status) for /api/history, given its query args (a dict)"""
+    try:
+        global _history
+        if _history is None:
+            _history = HistoryStore(HISTORY_FILE)
+        
+        metric = args.get('metric')
+        if not metric:
+            return {"metrics": _history.metrics()}, 200
+        
+        match = re.fullmatch(r'(\d+)([mhd])', args.get('range', '24h'))
+        if not match:
+            return {"error": "range must look like 30m, 24h or 7d"}, 400
+        end = time.time()
+        start = end - int(match.group(1)) * RANGE_UNITS[match.group(2)]
+        
+        points = args.get('points', '500')
+        if not re.fullmatch(r'\d+', points) or int(points) < 1:
+            return {"error": "points must be a positive integer"}, 400
+        
+        result = _history.query(metric, start, end, int(points))
+        return {
+            "metric": metric,
+            **result,
+            "timestamp": datetime.now().isoformat()
+        }, 200
+    
+    except Exception as e:
+        return {"error": str(e), "points": []}, 500
+
+def list_rows(name, payload):
+    _, key, _, _ = LISTS[name]
+    rows = payload.get(key) if key is not None and isinstance(payload, dict) else payload
+    return rows if isinstance(rows, list) else []
+
+def list_payload(name, payload, args):
+    """(payload, status) for a list endpoint, given its section's payload and query args"""
+    _, _, id_of, summary = LISTS[name]
+    try:
+        page = query_rows(list_rows(name, payload), args, id_of, summary)
+    except QueryError as e:
+        return {"error": str(e), name: []}, 400
+    return {
+        name: page['items'],
+        "count": len(page['items']),
+        "total": page['total'],
+        "nextCursor": page['nextCursor'],
+        "timestamp": datetime.now().isoformat()
+    }, 200
+
+def detail_payload(name, payload, item_id):
+    """(payload, status) for one item of a list, with every field"""
+    _, _, id_of, _ = LISTS[name]
+    row = find_row(list_rows(name, payload), id_of, item_id)
+    if row is None:
+        return {"error": f"no {name} item {item_id}"}, 404
+    return row, 200
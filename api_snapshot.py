@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+In-memory snapshots for the dashboard API
+
+Instead of doing the work on every request, the API process runs each
+section's collector in the background on its own interval and publishes
+the results as immutable Snapshot objects. Readers always hold a complete
+snapshot (the front buffer) while the next one is built off to the side
+and swapped in with a single reference assignment, so a request never
+sees a half-updated state and never waits for a collector. Each snapshot
+serializes and compresses a section at most once; unchanged sections
+carry their bytes over to the next snapshot.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from metrics import CollectorMetrics
+from snapshot_output import encode_json, gzip_bytes, brotli_bytes
+
+# How many section changes the replay buffer remembers
+REPLAY_EVENTS = 512
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 256
+
+# Content coding -> compressor, in server preference order (a compressor
+# returns None when its library isn't installed)
+COMPRESSORS = {'br': brotli_bytes, 'gzip': gzip_bytes}
+
+def preferred_codings(accept_encoding):
+    """Codings from COMPRESSORS the client accepts, most preferred first"""
+    weights = {}
+    for item in (accept_encoding or '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            weights[coding.lower()] = q
+    default = weights.get('*', 0.0)
+    accepted = [c for c in COMPRESSORS if weights.get(c, default) > 0]
+    # sorted() is stable, so ties keep the server's order
+    return sorted(accepted, key=lambda c: -weights.get(c, default))
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return etag in tags or 'W/' + etag in tags
+
+def format_event(event_id, name, body):
+    """One Server-Sent Events message carrying a section's JSON body"""
+    return (b'id: ' + event_id.encode('ascii') + b'\n'
+            b'data: {"section":"' + name.encode('utf-8') + b'","data":' + body + b'}\n\n')
+
+def reports_error(payload):
+    """True if a collector returned an error payload instead of raising"""
+    return isinstance(payload, dict) and 'error' in payload
+
+class Snapshot:
+    """One immutable version of every section's payload.
+
+    version increases with every change to any section; versions[name] is
+    the snapshot version in which that section last changed.
+    """
+
+    def __init__(self, version, sections, versions, bodies=None, compressed=None):
+        self.version = version
+        self.sections = MappingProxyType(sections)
+        self.versions = MappingProxyType(versions)
+        self.created_at = time.time()
+        # name -> serialized payload, filled in lazily (and at most once)
+        self._bodies = dict(bodies or {})
+        # (name, coding) -> compressed payload, likewise
+        self._compressed = dict(compressed or {})
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Payload of a section, or None if it hasn't been collected yet"""
+        return self.sections.get(name)
+
+    def body(self, name):
+        """Payload of a section as JSON bytes, serialized once per version"""
+        body = self._bodies.get(name)
+        if body is None and name in self.sections:
+            with self._lock:
+                body = self._bodies.get(name)
+                if body is None:
+                    body = self._bodies[name] = encode_json(self.sections[name])
+        return body
+
+    def encoded(self, name, accept_encoding=None):
+        """(body, content coding or None) for a client's Accept-Encoding.
+
+        Each section is compressed at most once per coding and version.
+        """
+        body = self.body(name)
+        if body is None or len(body) < MIN_COMPRESS_BYTES:
+            return body, None
+        for coding in preferred_codings(accept_encoding):
+            key = (name, coding)
+            compressed = self._compressed.get(key)
+            if compressed is None:
+                with self._lock:
+                    compressed = self._compressed.get(key)
+                    if compressed is None:
+                        compressed = COMPRESSORS[coding](body)
+                        if compressed is None:
+                            continue
+                        self._compressed[key] = compressed
+            return compressed, coding
+        return body, None
+
+    def derive(self, changes):
+        """The next snapshot, with the sections in changes replaced"""
+        version = self.version + 1
+        sections = dict(self.sections)
+        sections.update(changes)
+        versions = dict(self.versions)
+        versions.update((name, version) for name in changes)
+        bodies = {k: v for k, v in self._bodies.items() if k not in changes}
+        compressed = {k: v for k, v in self._compressed.items() if k[0] not in changes}
+        return Snapshot(version, sections, versions, bodies, compressed)
+
+def same_payload(old, new):
+    """True if two payloads differ at most in their timestamp"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return old == new
+    return ({k: v for k, v in old.items() if k != 'timestamp'} ==
+            {k: v for k, v in new.items() if k != 'timestamp'})
+
+class SnapshotRefresher:
+    """Runs section collectors on their intervals and publishes snapshots.
+
+    sections maps a name to (collector, interval in seconds) or
+    (collector, interval, True). A collector returns the section's full
+    response payload; with True, it returns a dict whose keys are
+    published as separate sections named "name.key". A result that only
+    differs from the current one in its timestamp doesn't create a new
+    version, so clients can tell nothing changed.
+
+    The names of recently changed sections are kept in a bounded replay
+    buffer, so a client that reconnects can be sent just what changed
+    while it was away.
+    """
+
+    def __init__(self, sections):
+        self.sections = sections
+        self.snapshot = Snapshot(0, {}, {})
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.pool = None
+        # Identifies this process's version numbers in event ids, so a
+        # client resuming against a restarted server starts over
+        self.boot = format(int(time.time()), 'x')
+        # (version, section) of recent changes; replay from any version
+        # >= replay_floor is complete
+        self.recent = deque(maxlen=REPLAY_EVENTS)
+        self.replay_floor = 0
+        # Duration, failures and last success of every collector run
+        self.metrics = CollectorMetrics(sections)
+
+    def start(self):
+        """Start the background refresher (once)"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.pool = ThreadPoolExecutor(max_workers=len(self.sections),
+                                           thread_name_prefix='api-collector')
+            self.thread = threading.Thread(target=self.run, name='api-refresher', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop scheduling collectors"""
+        self.stop_event.set()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def current(self):
+        """The latest snapshot; holding on to it is safe"""
+        return self.snapshot
+
+    def wait_for(self, name, timeout):
+        """The latest snapshot once it has section name (or after timeout)"""
+        with self.changed:
+            self.changed.wait_for(lambda: name in self.snapshot.sections, timeout)
+            return self.snapshot
+
+    def wait_newer(self, version, timeout):
+        """The latest snapshot once it is newer than version (or after timeout)"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.snapshot.version > version, timeout)
+            return self.snapshot
+
+    def etag(self, snapshot, name, coding=None):
+        """Strong ETag of a section's representation in snapshot"""
+        suffix = f"-{coding}" if coding else ""
+        return f'"{self.boot}-{snapshot.versions[name]}{suffix}"'
+
+    def changed_since(self, version):
+        """Sections changed after version, or None if the replay buffer no longer covers it"""
+        with self.lock:
+            if version < self.replay_floor or version > self.snapshot.version:
+                return None
+            return {name for v, name in self.recent if v > version}
+
+    def resume_events(self, last_event_id, prefix=''):
+        """(version, SSE messages) that bring a client up to date.
+
+        Resumes from Last-Event-ID when the replay buffer still covers it,
+        otherwise sends every section whose name starts with prefix.
+        """
+        snapshot = self.current()
+        names = None
+        boot, _, version = (last_event_id or '').partition('-')
+        if boot == self.boot and version.isdigit():
+            names = self.changed_since(int(version))
+        if names is None:
+            names = snapshot.sections.keys()
+        event_id = f"{self.boot}-{snapshot.version}"
+        messages = [format_event(event_id, name, snapshot.body(name))
+                    for name in sorted(names) if name.startswith(prefix)]
+        return snapshot.version, messages
+
+    def change_events(self, snapshot, version, prefix=''):
+        """SSE messages for the sections that changed in snapshot after version"""
+        event_id = f"{self.boot}-{snapshot.version}"
+        return [format_event(event_id, name, snapshot.body(name))
+                for name, changed in snapshot.versions.items()
+                if changed > version and name.startswith(prefix)]
+
+    def publish(self, name, payload):
+        """Swap in a snapshot with the section's new payload"""
+        self.publish_many({name: payload})
+
+    def publish_many(self, payloads):
+        """Swap in one snapshot with every changed section in payloads"""
+        with self.changed:
+            current = self.snapshot.sections
+            changes = {name: payload for name, payload in payloads.items()
+                       if name not in current or not same_payload(current[name], payload)}
+            if not changes:
+                return
+            self.snapshot = self.snapshot.derive(changes)
+            for name in changes:
+                if len(self.recent) == self.recent.maxlen:
+                    self.replay_floor = self.recent[0][0]
+                self.recent.append((self.snapshot.version, name))
+            self.changed.notify_all()
+
+    def publish_result(self, name, payload):
+        """Publish what a section's collector returned (split if configured)"""
+        _, _, *split = self.sections[name]
+        if split and split[0]:
+            self.publish_many({f"{name}.{key}": value for key, value in payload.items()})
+        else:
+            self.publish(name, payload)
+
+    def collect(self, name):
+        collector = self.sections[name][0]
+        started = time.perf_counter()
+        try:
+            payload = collector()
+        except Exception as e:
+            self.metrics.observe(name, time.perf_counter() - started, ok=False)
+            print(f"[WARN] {name} refresh failed: {e}")
+            return
+        self.metrics.observe(name, time.perf_counter() - started, ok=not reports_error(payload))
+        self.publish_result(name, payload)
+
+    def run(self):
+        due = {name: 0 for name in self.sections}
+        running = {}
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            for name, (_, interval, *_) in self.sections.items():
+                if now < due[name]:
+                    continue
+                due[name] = now + interval
+                # Skip the tick rather than queue a second run behind a
+                # collector that is still going
+                if name in running and not running[name].done():
+                    continue
+                running[name] = self.pool.submit(self.collect, name)
+            self.stop_event.wait(max(0, min(due.values()) - time.monotonic()))
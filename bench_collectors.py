@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Benchmark every collector against a synthetic workspace
+
+Builds a workspace at the chosen scale - a trades.md journal, a deep
+directory tree, a clip_empire.db full of publish_jobs rows and a fake
+openclaw CLI (reached through a fake powershell, like on the real box)
+that answers after a configurable latency - then times each
+generate_data.py collector, the api.py collectors and a full snapshot,
+and reports p50/p95 per benchmark. Caches are cleared before every run,
+so each one does the full work (--warm keeps them, like the daemon).
+
+    python bench_collectors.py [--scale small|medium|full] [--repeat 10]
+        [--workspace DIR] [--latency-ms 50]
+        [--save-baseline bench_baseline.json] [--baseline bench_baseline.json]
+
+With --baseline, every benchmark's p50 is compared against the stored
+one and the exit status is 1 if any got more than --threshold times
+slower. The fake CLI is a Python script with a shebang, so the openclaw
+benchmarks need a POSIX system.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import stat
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_trade_journal import generate_journal
+
+# Workspace size presets
+SCALES = {
+    'small': {'trades_lines': 10000, 'files': 20000, 'jobs': 100000, 'bots': 20, 'sessions': 50},
+    'medium': {'trades_lines': 100000, 'files': 200000, 'jobs': 1000000, 'bots': 50, 'sessions': 200},
+    'full': {'trades_lines': 100000, 'files': 1000000, 'jobs': 3000000, 'bots': 100, 'sessions': 500},
+}
+
+# Directory tree shape: files per leaf directory, subdirectories per level
+FILES_PER_DIR = 100
+FANOUT = 10
+
+# Share of the tree's files under data/ (the dataSize folder)
+DATA_SHARE = 0.2
+
+# Fail the baseline comparison when a p50 gets this many times slower
+REGRESSION_THRESHOLD = 1.25
+# ...and by at least this many ms, so sub-millisecond jitter isn't flagged
+REGRESSION_FLOOR_MS = 1
+
+CHANNELS = ['arc_highlightz', 'fomo_highlights', 'viral_recaps', 'market_meltdowns',
+            'crypto_confessions', 'rich_or_ruined', 'startup_graveyard', 'self_made_clips',
+            'ai_did_what', 'gym_moments', 'kitchen_chaos', 'cases_unsolved', 'unfiltered_clips']
+
+JOB_STATUSES = ['succeeded'] * 80 + ['failed'] * 8 + ['queued'] * 10 + ['running'] * 2
+
+FAKE_CLI = '''#!{python}
+"""Fake openclaw CLI for bench_collectors.py"""
+import json, sys, time
+time.sleep({latency})
+args = [a for a in sys.argv[1:] if a not in ('-Command', 'openclaw')]
+if args[:2] == ['cron', 'list']:
+    print("ID Name Schedule Next Last Status Target Agent")
+    for i in range({bots}):
+        print(f"cron{{i:04d}}abcdef Bench Bot {{i}} cron */15 * * * * in 12m 3m ago ok isolated main")
+elif args[:2] == ['sessions', 'list']:
+    now = int(time.time() * 1000)
+    print(json.dumps({{'sessions': [
+        {{'key': f'agent:main:discord:channel:{{i:018d}}', 'displayName': f'Bench {{i}}',
+          'channel': 'discord', 'kind': 'group', 'model': 'claude-sonnet-4-5',
+          'totalTokens': 1000 * i, 'updatedAt': now - 60000 * i}}
+        for i in range({sessions})]}}))
+else:
+    sys.exit(1)
+'''
+
+def generate_tree(root, files, seed=1):
+    """files small files in a tree FANOUT wide, FILES_PER_DIR per leaf"""
+    rng = random.Random(seed)
+    dirs = max(1, math.ceil(files / FILES_PER_DIR))
+    depth = max(1, math.ceil(math.log(dirs, FANOUT))) if dirs > 1 else 1
+    data_dirs = int(dirs * DATA_SHARE)
+    payload = b'x' * 4096
+    for d in range(dirs):
+        digits = []
+        n = d
+        for _ in range(depth):
+            n, digit = divmod(n, FANOUT)
+            digits.append(f"d{digit}")
+        top = 'data' if d < data_dirs else 'projects'
+        folder = os.path.join(root, top, *reversed(digits))
+        os.makedirs(folder, exist_ok=True)
+        for f in range(min(FILES_PER_DIR, files - d * FILES_PER_DIR)):
+            with open(os.path.join(folder, f"f{f}.txt"), 'wb') as out:
+                out.write(payload[:rng.randrange(4096)])
+
+def generate_clip_empire(db, jobs, seed=1):
+    """clip_empire.db with every channel and jobs publish_jobs rows over 90 days"""
+    import migrate_clip_empire
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db)
+    conn.executescript("""
+        CREATE TABLE channels (channel_name TEXT PRIMARY KEY, status TEXT, daily_target INTEGER);
+        CREATE TABLE publish_jobs (id INTEGER PRIMARY KEY, channel_name TEXT, status TEXT,
+                                   created_at TEXT, caption_text TEXT);
+    """)
+    conn.executemany("INSERT INTO channels VALUES (?, ?, ?)",
+                     [(c, 'active' if i % 4 else 'paused', 5 + i % 6) for i, c in enumerate(CHANNELS)])
+    now = datetime.now()
+    def rows():
+        for i in range(jobs):
+            created = now - timedelta(seconds=rng.randrange(90 * 86400))
+            yield (rng.choice(CHANNELS), rng.choice(JOB_STATUSES),
+                   created.strftime('%Y-%m-%d %H:%M:%S'), f"Clip {i}: a synthetic caption for benchmarking")
+    conn.executemany("INSERT INTO publish_jobs (channel_name, status, created_at, caption_text) "
+                     "VALUES (?, ?, ?, ?)", rows())
+    conn.commit()
+    conn.close()
+    # The indexes the real database has
+    migrate_clip_empire.migrate(db)
+
+def write_fake_cli(bin_dir, latency_ms, bots, sessions):
+    """powershell and openclaw executables that answer like openclaw"""
+    os.makedirs(bin_dir, exist_ok=True)
+    script = FAKE_CLI.format(python=sys.executable, latency=latency_ms / 1000,
+                             bots=bots, sessions=sessions)
+    for name in ('openclaw', 'powershell'):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+def build_workspace(root, params):
+    """Generate the workspace unless root already holds one with these params"""
+    marker = os.path.join(root, '.bench.json')
+    workspace_params = {k: params[k] for k in ('trades_lines', 'files', 'jobs')}
+    try:
+        with open(marker) as f:
+            if json.load(f) == workspace_params:
+                print(f"[OK] Reusing workspace {root}")
+                return
+    except (OSError, ValueError):
+        pass
+
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    started = time.perf_counter()
+    os.makedirs(os.path.join(root, 'memory'))
+    generate_journal(os.path.join(root, 'memory', 'trades.md'), params['trades_lines'])
+    generate_tree(root, params['files'])
+    db_dir = os.path.join(root, 'ventures', 'clip_empire', 'data')
+    os.makedirs(db_dir)
+    generate_clip_empire(os.path.join(db_dir, 'clip_empire.db'), params['jobs'])
+    os.makedirs(os.path.join(root, 'ventures', 'clip_engine'))
+    with open(os.path.join(root, 'ventures', 'clip_engine', 'youtube_quota.txt'), 'w') as f:
+        f.write('1234')
+    with open(marker, 'w') as f:
+        json.dump(workspace_params, f)
+    print(f"[OK] Generated workspace in {time.perf_counter() - started:.1f}s: "
+          f"{params['trades_lines']:,} journal lines, {params['files']:,} files, {params['jobs']:,} jobs")
+
+def percentile(values, pct):
+    """Linearly interpolated percentile of values"""
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def measure(fn, repeat, reset=None):
+    """Run fn repeat times (reset before each, untimed); returns ms stats"""
+    times = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        # Collectors print progress and warnings; keep them out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - started) * 1000)
+    return {
+        'p50': round(percentile(times, 50), 3),
+        'p95': round(percentile(times, 95), 3),
+        'min': round(min(times), 3),
+        'runs': repeat,
+    }
+
+def point_at(workspace, out_dir):
+    """Aim generate_data.py and api_collectors.py at the synthetic workspace"""
+    import api_collectors
+    import generate_data as g
+
+    g.WORKSPACE = api_collectors.WORKSPACE = workspace
+    g.OUTPUT_FILE = os.path.join(out_dir, 'data.json')
+    g.STATE_FILE = os.path.join(out_dir, 'collector_state.json')
+    g.FOLDER_INDEX_FILE = os.path.join(out_dir, 'folder_index.json')
+    g.DELTA_FILE = os.path.join(out_dir, 'deltas.json')
+    g.HISTORY_FILE = os.path.join(out_dir, 'history.db')
+    g.TOKEN_LEDGER_FILE = os.path.join(out_dir, 'token_ledger.db')
+    g.PRICE_SOURCE = os.path.join(out_dir, 'mids.json')
+    with open(g.PRICE_SOURCE, 'w') as f:
+        json.dump({'BTC': '67000', 'ETH': '3500', 'SOL': '150'}, f)
+    api_collectors.HISTORY_FILE = g.HISTORY_FILE
+    api_collectors.DATA_FILE = g.OUTPUT_FILE
+    api_collectors.FOLDER_INDEX_FILE = os.path.join(out_dir, 'api_folder_index.json')
+
+def reset_caches():
+    """Forget everything the collectors cache between runs"""
+    import api_collectors
+    import generate_data as g
+
+    g._memo.clear()
+    g._trades_journals.clear()
+    g._folder_indexes.clear()
+    g._price_feed = None
+    for db in list(g._clip_empire_conns):
+        g.close_clip_empire_connection(db)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(g.FOLDER_INDEX_FILE)
+    api_collectors._journal = None
+    api_collectors._folder_index = None
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(api_collectors.FOLDER_INDEX_FILE)
+
+def run_benchmarks(repeat, warm):
+    import api_collectors
+    import generate_data as g
+
+    reset = None if warm else reset_caches
+    results = {}
+    for name, (fn, _, _) in g.COLLECTORS.items():
+        results[f"collector.{name}"] = measure(fn, repeat, reset)
+        print(f"  - collector.{name}")
+
+    def snapshot():
+        results_, sections = g.collect_all(last_good={})
+        g.write_snapshot(g.build_snapshot(results_, sections))
+    results['snapshot'] = measure(snapshot, repeat, reset)
+    print("  - snapshot")
+
+    for name in ('collect_positions', 'collect_system', 'collect_cron'):
+        results[f"api.{name}"] = measure(getattr(api_collectors, name), repeat, reset)
+        print(f"  - api.{name}")
+    return results
+
+def print_results(results, baseline=None, threshold=REGRESSION_THRESHOLD):
+    """Print the report; returns the names of benchmarks that regressed"""
+    regressions = []
+    header = f"{'benchmark':<28} {'p50 ms':>10} {'p95 ms':>10}"
+    if baseline:
+        header += f" {'base p50':>10} {'ratio':>7}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:<28} {r['p50']:>10.2f} {r['p95']:>10.2f}"
+        base = (baseline or {}).get(name)
+        if base:
+            ratio = r['p50'] / base['p50'] if base['p50'] else float('inf')
+            line += f" {base['p50']:>10.2f} {ratio:>6.2f}x"
+            if ratio > threshold and r['p50'] - base['p50'] >= REGRESSION_FLOOR_MS:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard collectors on a synthetic workspace")
+    parser.add_argument('--scale', choices=SCALES, default='small', help="workspace size preset")
+    parser.add_argument('--trades-lines', type=int, help="override the journal size")
+    parser.add_argument('--files', type=int, help="override the directory tree size")
+    parser.add_argument('--jobs', type=int, help="override the publish_jobs row count")
+    parser.add_argument('--latency-ms', type=float, default=50, help="fake openclaw response time")
+    parser.add_argument('--repeat', type=int, default=10, help="runs per benchmark")
+    parser.add_argument('--warm', action='store_true', help="keep caches between runs (daemon steady state)")
+    parser.add_argument('--workspace', help="generate into (or reuse) this directory instead of a temp one")
+    parser.add_argument('--baseline', help="compare against this results JSON")
+    parser.add_argument('--save-baseline', help="write the results JSON here")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="p50 ratio over the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in ('trades_lines', 'files', 'jobs'):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    params['latency_ms'] = args.latency_ms
+
+    tmp = tempfile.mkdtemp(prefix='openclaw-bench-')
+    try:
+        workspace = args.workspace or os.path.join(tmp, 'workspace')
+        build_workspace(workspace, params)
+        bin_dir = os.path.join(tmp, 'bin')
+        write_fake_cli(bin_dir, args.latency_ms, params['bots'], params['sessions'])
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+        out_dir = os.path.join(tmp, 'out')
+        os.makedirs(out_dir)
+        point_at(workspace, out_dir)
+
+        print(f"Running {args.repeat} {'warm' if args.warm else 'cold'} runs per benchmark...")
+        results = run_benchmarks(args.repeat, args.warm)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            baseline = stored['results']
+            if stored.get('params') != params:
+                print(f"[WARN] Baseline was measured at a different scale: {stored.get('params')}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Could not read baseline {args.baseline}: {e}")
+
+    print()
+    regressions = print_results(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'params': params,
+                'repeat': args.repeat,
+                'warm': args.warm,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'createdAt': datetime.now().isoformat(),
+                'results': results,
+            }, f, indent=2)
+        print(f"[OK] Saved baseline to {args.save_baseline}")
+
+    if regressions:
+        print(f"[WARN] {len(regressions)} benchmark(s) slower than {args.threshold}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trade-journal parser on a generated journal
+
+Writes a synthetic trades.md of OPEN / UPDATE / CLOSED blocks (100k lines
+by default) to a temp directory and times a streaming parse, a full
+TradesJournal parse, a refresh after a small append and a refresh of an
+unchanged file.
+
+    python bench_trade_journal.py [--lines 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from trade_journal import TradesJournal, iter_positions
+
+COINS = ['BTC', 'ETH', 'SOL', 'DOGE', 'ARB', 'AVAX', 'LINK', 'OP', 'SUI', 'TIA']
+
+def generate_journal(path, lines, seed=1):
+    """Write a journal of roughly the given number of lines"""
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Trades\n\n")
+        while written < lines:
+            coin = rng.choice(COINS)
+            direction = rng.choice(['LONG', 'SHORT'])
+            entry = rng.uniform(1, 70000)
+            kind = rng.random()
+            if kind < 0.6:
+                f.write(f"## OPEN: {coin} {direction}\n"
+                        f"- **Strategy:** {rng.choice(['RSI', 'SMC', 'Breakout'])}\n"
+                        f"- **Size:** {rng.uniform(0.01, 100):.4f}\n"
+                        f"- **Entry:** ${entry:,.2f}\n"
+                        f"- **Stop Loss:** ${entry * 0.97:,.2f}\n"
+                        f"- **Take Profit:** ${entry * 1.05:,.2f}\n\n")
+                written += 7
+            elif kind < 0.8:
+                f.write(f"## UPDATE: {coin} {direction}\n"
+                        f"- **Stop Loss:** ${entry * 0.99:,.2f}\n\n")
+                written += 3
+            else:
+                f.write(f"## CLOSED: {coin} {direction}\n"
+                        f"- **Exit:** ${entry:,.2f}\n\n")
+                written += 3
+    return written
+
+def best_of(repeat, fn):
+    """Fastest of repeat runs of fn, in milliseconds, and its last result"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def stream(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(iter_positions(f))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trade-journal parser")
+    parser.add_argument('--lines', type=int, default=100000, help="journal size in lines")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trades.md')
+        lines = generate_journal(path, args.lines)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Journal: {lines:,} lines, {size_mb:.1f} MB")
+
+        ms, positions = best_of(args.repeat, lambda: stream(path))
+        print(f"  - iter_positions (streaming):  {ms:8.1f} ms  ({lines / ms * 1000:,.0f} lines/s, {len(positions)} open)")
+
+        ms, _ = best_of(args.repeat, lambda: TradesJournal(path).refresh())
+        print(f"  - TradesJournal full parse:    {ms:8.1f} ms")
+
+        journal = TradesJournal(path)
+        journal.refresh()
+
+        def append_and_refresh():
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("## OPEN: BTC LONG\n- **Size:** 0.01\n- **Entry:** $67000\n\n")
+            return journal.refresh()
+        ms, _ = best_of(args.repeat, append_and_refresh)
+        print(f"  - refresh after 4-line append: {ms:8.3f} ms")
+
+        ms, _ = best_of(args.repeat, journal.refresh)
+        print(f"  - refresh of unchanged file:   {ms:8.3f} ms")
+
+        # The incremental parse must agree with a fresh one
+        assert journal.refresh() == stream(path)
+
+if __name__ == '__main__':
+    main()
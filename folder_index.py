@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Persistent per-directory size index for the OpenClaw workspace
+
+Walking the whole workspace with os.walk and stat-ing every file on every
+run is the slowest part of a snapshot. This index remembers, for every
+directory, its mtime, the bytes of the files directly inside it and its
+subdirectories. A refresh stats each directory once and only re-scans
+(with os.scandir) the directories whose mtime changed - i.e. where entries
+were added, removed or renamed - then rolls totals up the tree, so any
+subtree total comes out of the same refresh.
+
+A directory's mtime does not change when a file inside it grows in place,
+so such growth is only picked up when that directory is re-scanned for
+another reason, or after MAX_AGE forces a full re-scan.
+"""
+
+import json
+import os
+import time
+
+# Directory names that are never counted
+SKIP_DIRS = {'.git', 'node_modules'}
+
+# Force a full re-scan after this many seconds to pick up in-place growth
+MAX_AGE = 24 * 3600
+
+# Watcher-driven updates save the index at most this often (seconds)
+SAVE_INTERVAL = 600
+
+class FolderIndex:
+    """Directory size index rooted at one folder, persisted as JSON"""
+
+    def __init__(self, root, index_file=None):
+        self.root = os.path.normpath(root)
+        self.index_file = index_file
+        # Full path -> {'mtime': ns, 'files': bytes, 'dirs': [names], 'total': bytes}
+        self.dirs = {}
+        self.scanned_at = 0
+        self.saved_at = 0
+        self.rescanned = 0
+        # False until a refresh() has checked the loaded index against disk
+        self.reconciled = False
+        self.load()
+
+    def load(self):
+        """Load the index saved by a previous run, if it matches this root"""
+        if not self.index_file:
+            return
+        try:
+            with open(self.index_file, 'r') as f:
+                saved = json.load(f)
+        except:
+            return
+        if saved.get('root') != self.root:
+            return
+
+        self.scanned_at = saved.get('scannedAt', 0)
+        for rel, (mtime, files, dirs, total) in saved.get('dirs', {}).items():
+            path = self.root if rel == '.' else os.path.join(self.root, rel)
+            self.dirs[path] = {'mtime': mtime, 'files': files, 'dirs': dirs, 'total': total}
+
+    def save(self):
+        """Write the index atomically so a crash never leaves half a file"""
+        if not self.index_file:
+            return
+        saved = {
+            'root': self.root,
+            'scannedAt': self.scanned_at,
+            'dirs': {
+                os.path.relpath(path, self.root): [e['mtime'], e['files'], e['dirs'], e['total']]
+                for path, e in self.dirs.items()
+            },
+        }
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(saved, f, separators=(',', ':'))
+        os.replace(tmp_file, self.index_file)
+
+    def refresh(self):
+        """Re-scan changed directories and roll totals up the tree"""
+        now = time.time()
+        full = now - self.scanned_at > MAX_AGE
+        new, rescanned = index_tree(self.root, {} if full else self.dirs)
+
+        changed = rescanned or len(new) != len(self.dirs)
+        self.dirs = new
+        self.rescanned = rescanned
+        self.reconciled = True
+        if full:
+            self.scanned_at = now
+        if changed:
+            self.save_quietly(now)
+        return rescanned
+
+    def update(self, paths):
+        """Re-scan only the given directories and push size changes up to the root.
+
+        Used when a watcher already knows which directories changed, so not
+        even the per-directory stat walk of refresh() is needed. The watcher
+        only sees changes made while it runs, so the first call (checking an
+        index saved by an earlier run) and any call after MAX_AGE do a
+        refresh() instead.
+        """
+        if not self.reconciled or not self.dirs or time.time() - self.scanned_at > MAX_AGE:
+            return self.refresh()
+
+        rescanned = 0
+        for path in sorted({os.path.normpath(p) for p in paths}, key=len, reverse=True):
+            old = self.dirs.get(path)
+            if old is None:
+                # Not indexed yet; its parent's re-scan will pick it up
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                # Gone; its parent's re-scan drops it
+                continue
+
+            entry = scan_dir(path, mtime)
+            rescanned += 1
+            for name in set(old['dirs']) - set(entry['dirs']):
+                self.drop(os.path.join(path, name))
+            for name in set(entry['dirs']) - set(old['dirs']):
+                added, count = index_tree(os.path.join(path, name), {})
+                self.dirs.update(added)
+                rescanned += count
+
+            entry['total'] = entry['files'] + sum(
+                self.size(os.path.join(path, name)) for name in entry['dirs'])
+            self.dirs[path] = entry
+
+            delta = entry['total'] - old['total']
+            parent = path
+            while delta and parent != self.root:
+                parent = os.path.dirname(parent)
+                if parent not in self.dirs:
+                    break
+                self.dirs[parent]['total'] += delta
+
+        self.rescanned = rescanned
+        if rescanned and time.time() - self.saved_at > SAVE_INTERVAL:
+            self.save_quietly()
+        return rescanned
+
+    def drop(self, path):
+        """Forget a directory and everything below it"""
+        prefix = path + os.sep
+        for key in [k for k in self.dirs if k == path or k.startswith(prefix)]:
+            del self.dirs[key]
+
+    def save_quietly(self, now=None):
+        """save() that only warns on failure"""
+        try:
+            self.save()
+            self.saved_at = time.time() if now is None else now
+        except Exception as e:
+            print(f"[WARN] Could not save folder index: {e}")
+
+    def size(self, path=None):
+        """Total bytes under path (the root by default), 0 if not indexed"""
+        path = self.root if path is None else os.path.normpath(path)
+        entry = self.dirs.get(path)
+        return entry['total'] if entry else 0
+
+def index_tree(top, old):
+    """Index every directory under top, reusing entries of old whose mtime still matches.
+
+    Returns (entries, number of directories re-scanned) with totals rolled up.
+    """
+    new = {}
+    order = []
+    rescanned = 0
+
+    # Iterative so deep trees can't hit the recursion limit
+    stack = [top]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        entry = old.get(path)
+        if entry is None or entry['mtime'] != mtime:
+            entry = scan_dir(path, mtime)
+            rescanned += 1
+        new[path] = entry
+        order.append(path)
+        stack.extend(os.path.join(path, name) for name in entry['dirs'])
+
+    # Parents come before their children in order, so walking it
+    # backwards totals every child before its parent
+    for path in reversed(order):
+        entry = new[path]
+        entry['total'] = entry['files'] + sum(
+            new[child]['total']
+            for child in (os.path.join(path, name) for name in entry['dirs'])
+            if child in new
+        )
+    return new, rescanned
+
+def scan_dir(path, mtime):
+    """List one directory: bytes of the files in it and its subdirectory names"""
+    files = 0
+    dirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            dirs.append(entry.name)
+                    elif entry.is_file():
+                        files += entry.stat().st_size
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return {'mtime': mtime, 'files': files, 'dirs': dirs, 'total': files}
@@ -4,261 +4,358 @@ Generate data.json for OpenClaw Dashboard
 Run this periodically (e.g., via cron) to update dashboard with real data
 """
 
+import argparse
+import functools
 import json
+import math
 import os
 import re
-from datetime import datetime
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as CollectorTimeout
+from datetime import datetime, timedelta
+from urllib.request import pathname2url
 import subprocess
 
-WORKSPACE = r"C:\Users\kanaw\.openclaw\workspace"
+import timing
+import workspace_paths
+import workspace_watcher
+from folder_index import FolderIndex
+from history_store import HistoryStore
+from machine_sampler import MachineSampler
+from metrics import CollectorMetrics
+from price_feed import HYPERLIQUID_INFO_URL, PriceFeed, make_source
+from process_accounting import attribute_processes
+from profiling import Profiler
+from snapshot_delta import DeltaLog
+from snapshot_output import publish_json, publish_snapshot
+from token_ledger import TokenLedger
+from trade_journal import TradesJournal
+from valuation import revalue
+
+WORKSPACE = workspace_paths.WORKSPACE
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "data.json")
+# Last good value of every section, used when a collector misses its deadline
+STATE_FILE = os.path.join(os.path.dirname(__file__), "collector_state.json")
+# Recent snapshot-to-snapshot deltas, so dashboards don't refetch data.json
+DELTA_FILE = os.path.join(os.path.dirname(__file__), "deltas.json")
+# Time-series history of the snapshot's numeric metrics
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "history.db")
+# Where mid prices for marking positions come from: an allMids-style URL
+# (Hyperliquid, or a local mock server) or a JSON file of {coin: price}
+PRICE_SOURCE = HYPERLIQUID_INFO_URL
+# Per-session token deltas, so usage survives sessions expiring
+TOKEN_LEDGER_FILE = os.path.join(os.path.dirname(__file__), "token_ledger.db")
+# Per-directory size index, so folder sizes don't need a full walk every run
+FOLDER_INDEX_FILE = os.path.join(os.path.dirname(__file__), "folder_index.json")
+
+def trades_path():
+    """Path of the trade journal"""
+    return workspace_paths.trades_path(WORKSPACE)
+
+def clip_empire_db_path():
+    """Path of the Clip Empire SQLite DB"""
+    return workspace_paths.clip_empire_db_path(WORKSPACE)
+
+def youtube_quota_path():
+    """Path of the file the clip engine writes its YouTube quota usage to"""
+    return workspace_paths.youtube_quota_path(WORKSPACE)
+
+# Memoized collectors: name -> (input fingerprint, result)
+_memo = {}
+# Memoized collectors: name -> {'hits': n, 'misses': n}, reported in _meta
+MEMO_STATS = {}
+
+def file_fingerprint(*paths):
+    """[size, mtime_ns] of every path, None for a missing one"""
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append([st.st_size, st.st_mtime_ns])
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+def memoized(name, collector, fingerprint):
+    """Wrap collector so it only does its work when its inputs changed.
+
+    fingerprint must be cheap and return a JSON-able value that changes
+    whenever the collector's result would; while it matches the last run
+    the cached result is returned. A fingerprint of None (or one that
+    raises) always runs the collector.
+    """
+    def run():
+        try:
+            key = fingerprint()
+        except Exception:
+            key = None
+        counters = MEMO_STATS.setdefault(name, {'hits': 0, 'misses': 0})
+
+        cached = _memo.get(name)
+        if key is not None and cached is not None and cached[0] == key:
+            counters['hits'] += 1
+            return cached[1]
+
+        counters['misses'] += 1
+        value = collector()
+        _memo[name] = (key, value)
+        return value
+    return run
+
+def memo_fingerprint(name):
+    """Fingerprint behind the cached result of name, to persist with it"""
+    cached = _memo.get(name)
+    return cached[0] if cached else None
+
+def seed_memo(last_good):
+    """Prime the memo cache from the last good values of a previous run"""
+    for name, entry in last_good.items():
+        if entry.get('fingerprint') is not None and name not in _memo:
+            _memo[name] = (entry['fingerprint'], entry['value'])
+
+# One journal per trades.md path, kept across daemon ticks
+_trades_journals = {}
 
 def parse_trades():
     """Parse trades.md for open positions"""
-    positions = []
+    trades_file = trades_path()
+    journal = _trades_journals.get(trades_file)
+    if journal is None:
+        journal = _trades_journals[trades_file] = TradesJournal(trades_file)
     
     try:
-        trades_file = os.path.join(WORKSPACE, "memory", "trades.md")
-        if not os.path.exists(trades_file):
-            return positions
-        
-        with open(trades_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        current_pos = None
-        
-        for line in content.split('\n'):
-            if line.startswith('## OPEN:'):
-                # New position
-                match = re.match(r'## OPEN: (\w+) (LONG|SHORT)', line)
-                if match:
-                    if current_pos:
-                        positions.append(current_pos)
-                    current_pos = {
-                        'coin': match.group(1),
-                        'direction': match.group(2),
-                        'size': 0,
-                        'entry': 0,
-                        'sl': 0,
-                        'tp': 0,
-                        'strategy': 'Unknown',
-                        'pnl': 0,
-                        'pnlPercent': 0
-                    }
-            elif current_pos:
-                # Parse position details
-                if '**Strategy:**' in line:
-                    current_pos['strategy'] = line.split('**Strategy:**')[1].strip().split('\n')[0]
-                elif '**Size:**' in line:
-                    try:
-                        size_str = line.split('**Size:**')[1].strip().split('\n')[0]
-                        current_pos['size'] = float(size_str)
-                    except:
-                        pass
-                elif '**Entry:**' in line:
-                    try:
-                        entry_str = line.split('$')[1].strip().split('\n')[0]
-                        current_pos['entry'] = float(entry_str)
-                    except:
-                        pass
-                elif '**Stop Loss:**' in line:
-                    try:
-                        sl_str = line.split('$')[1].strip().split('\n')[0]
-                        current_pos['sl'] = float(sl_str)
-                    except:
-                        pass
-                elif '**Take Profit:**' in line:
-                    try:
-                        tp_str = line.split('$')[1].strip().split('\n')[0]
-                        current_pos['tp'] = float(tp_str)
-                    except:
-                        pass
-        
-        if current_pos:
-            positions.append(current_pos)
-    
+        return journal.refresh()
     except Exception as e:
         print(f"Error parsing trades: {e}")
-    
-    return positions
+        journal.reset()
+        return []
+
+_price_feed = None
+
+def get_prices():
+    """Current mid price of every coin, cached for a few seconds"""
+    global _price_feed
+    if _price_feed is None:
+        _price_feed = PriceFeed(make_source(PRICE_SOURCE))
+    with timing.span('price feed', 'http'):
+        return _price_feed.get()
 
-def get_folder_size(folder):
-    """Calculate folder size in MB"""
-    total_size = 0
+_folder_indexes = {}
+# inotify watcher started by --daemon on Linux, None while polling
+_watcher = None
+
+def get_folder_index(folder):
+    """Persistent size index for folder, loaded once per process"""
+    index = _folder_indexes.get(folder)
+    if index is None:
+        index = _folder_indexes[folder] = FolderIndex(folder, FOLDER_INDEX_FILE)
+    return index
+
+def get_folder_sizes():
+    """Workspace and data folder sizes in MB from one refresh of the size index"""
+    index = get_folder_index(WORKSPACE)
+    watcher = _watcher
     try:
-        for dirpath, dirnames, filenames in os.walk(folder):
-            # Skip large dirs
-            if '.git' in dirpath or 'node_modules' in dirpath:
-                continue
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except:
-                        pass
-    except:
-        pass
-    return round(total_size / (1024 * 1024), 2)
+        with timing.span('folder index', 'walk'):
+            if watcher:
+                # Only re-scan the directories the watcher saw change (the
+                # index itself falls back to a refresh() on the first pass
+                # and after MAX_AGE)
+                dirs, overflowed = watcher.take_dirty_dirs()
+                if overflowed:
+                    index.refresh()
+                else:
+                    index.update(dirs)
+            else:
+                index.refresh()
+    except Exception as e:
+        print(f"[WARN] Could not refresh folder index: {e}")
+    
+    # The data folder is a subtree of the workspace, so no second walk
+    sizes = {
+        'workspaceSize': round(index.size() / (1024 * 1024), 2),
+        'dataSize': round(index.size(os.path.join(WORKSPACE, "data")) / (1024 * 1024), 2),
+    }
+    if watcher:
+        sizes['recentFiles'] = watcher.recent_files()
+    return sizes
+
+def epoch_ms():
+    """Current time in epoch milliseconds, the unit of every *At field"""
+    return round(time.time() * 1000)
+
+DURATION_RE = re.compile(r'(\d+)\s*([smhdw])', re.IGNORECASE)
+DURATION_MS = {'s': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000, 'w': 604800000}
+
+def parse_duration_ms(text):
+    """Milliseconds in a duration like '28m', '5 min', '1h30m'; None if unparseable"""
+    matches = DURATION_RE.findall(text or '')
+    if not matches:
+        return None
+    return sum(int(value) * DURATION_MS[unit.lower()] for value, unit in matches)
+
+def run_command(label, args, **kwargs):
+    """subprocess.run inside a timing span"""
+    with timing.span(label, 'subprocess'):
+        return subprocess.run(args, **kwargs)
 
 def get_cron_bots():
     """Get cron job status from OpenClaw"""
     bots = []
     
-    try:
-        # Use PowerShell to run openclaw (it's a .ps1 script)
-        result = subprocess.run(
-            ['powershell', '-Command', 'openclaw', 'cron', 'list'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+    # Use PowerShell to run openclaw (it's a .ps1 script)
+    result = run_command(
+        'openclaw cron list',
+        ['powershell', '-Command', 'openclaw', 'cron', 'list'],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    
+    if result.returncode != 0:
+        # collect_all keeps the last good list and marks the section stale
+        raise RuntimeError(f"openclaw cron list failed: {result.stderr.strip()}")
+    
+    lines = result.stdout.strip().split('\n')
+    
+    # Skip header line
+    for line in lines[1:]:
+        if not line.strip():
+            continue
         
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            
-            # Skip header line
-            for line in lines[1:]:
-                if not line.strip():
-                    continue
-                
-                # Parse the line (space-separated columns)
-                parts = line.split()
-                if len(parts) < 8:
-                    continue
-                
-                # Extract fields
-                cron_id = parts[0]
-                
-                # Name might have spaces, so find where "cron" starts
-                name_parts = []
-                i = 1
-                while i < len(parts) and not parts[i].startswith('cron'):
-                    name_parts.append(parts[i])
-                    i += 1
-                name = ' '.join(name_parts)
-                
-                # Find other fields
-                next_run = 'Unknown'
-                last_run = 'Unknown'
-                status = 'unknown'
-                
-                # Look for "in" (next run), "ago" (last run), status
-                for j, part in enumerate(parts):
-                    if part == 'in' and j + 1 < len(parts):
-                        next_run = parts[j + 1]
-                    elif part.endswith('ago'):
-                        if j > 0:
-                            last_run = f"{parts[j-1]} {part}"
+        # Parse the line (space-separated columns)
+        parts = line.split()
+        if len(parts) < 8:
+            continue
+        
+        # Extract fields
+        cron_id = parts[0]
+        
+        # Name might have spaces, so find where "cron" starts
+        name_parts = []
+        i = 1
+        while i < len(parts) and not parts[i].startswith('cron'):
+            name_parts.append(parts[i])
+            i += 1
+        name = ' '.join(name_parts)
+        
+        # Find other fields
+        next_run = 'Unknown'
+        last_run = 'Unknown'
+        status = 'unknown'
+        
+        # Look for "in" (next run), "ago" (last run), status
+        for j, part in enumerate(parts):
+            if part == 'in' and j + 1 < len(parts):
+                next_run = parts[j + 1]
+            elif part.endswith('ago'):
+                if j > 0:
+                    last_run = f"{parts[j-1]} {part}"
+                else:
+                    last_run = part
+            elif part in ['ok', 'idle', 'error', 'running']:
+                status = part
+        
+        # Determine interval from schedule
+        interval = 'Unknown'
+        if 'cron' in parts:
+            sched_idx = parts.index('cron')
+            if sched_idx + 1 < len(parts):
+                sched = parts[sched_idx + 1]
+                if sched == '0':
+                    if sched_idx + 2 < len(parts):
+                        min_part = parts[sched_idx + 2]
+                        if '/' in min_part or '*' in min_part:
+                            interval = 'Hourly'
                         else:
-                            last_run = part
-                    elif part in ['ok', 'idle', 'error', 'running']:
-                        status = part
-                
-                # Determine interval from schedule
-                interval = 'Unknown'
-                if 'cron' in parts:
-                    sched_idx = parts.index('cron')
-                    if sched_idx + 1 < len(parts):
-                        sched = parts[sched_idx + 1]
-                        if sched == '0':
-                            if sched_idx + 2 < len(parts):
-                                min_part = parts[sched_idx + 2]
-                                if '/' in min_part or '*' in min_part:
-                                    interval = 'Hourly'
-                                else:
-                                    interval = 'Daily'
-                        elif '/' in sched:
-                            interval = sched.replace('*/', 'Every ') + ' min'
-                
-                bots.append({
-                    'name': name[:30],  # Truncate long names
-                    'status': status,
-                    'interval': interval,
-                    'lastRun': last_run,
-                    'nextRun': next_run,
-                    'errors': 0,  # Would need to track from logs
-                    'id': cron_id
-                })
-            
-            print(f"[OK] Parsed {len(bots)} cron jobs from openclaw")
-            return bots
-        else:
-            print(f"[WARN] openclaw cron list failed")
-    except Exception as e:
-        print(f"[WARN] Could not get cron bots: {e}")
+                            interval = 'Daily'
+                elif '/' in sched:
+                    interval = sched.replace('*/', 'Every ') + ' min'
+        
+        # Absolute times, so the dashboard can sort and count
+        # down without parsing the labels
+        now_ms = epoch_ms()
+        last_run_ms = parse_duration_ms(last_run)
+        next_run_ms = parse_duration_ms(next_run)
+        
+        bots.append({
+            'name': name[:30],  # Truncate long names
+            'status': status,
+            'interval': interval,
+            'lastRun': last_run,
+            'nextRun': next_run,
+            'lastRunAt': now_ms - last_run_ms if last_run_ms is not None else None,
+            'nextRunAt': now_ms + next_run_ms if next_run_ms is not None else None,
+            'errors': 0,  # Would need to track from logs
+            'id': cron_id
+        })
     
-    # Fallback mock data
-    return [
-        { 'name': 'RSI Bot', 'status': 'idle', 'interval': '30 min', 'lastRun': 'Unknown', 'nextRun': 'Unknown', 'errors': 0 },
-        { 'name': 'SMC Bot', 'status': 'idle', 'interval': 'Hourly', 'lastRun': 'Unknown', 'nextRun': 'Unknown', 'errors': 0 },
-    ]
+    print(f"[OK] Parsed {len(bots)} cron jobs from openclaw")
+    # CPU, memory and I/O of each bot's running processes
+    return attribute_processes(bots)
 
 def get_active_sessions():
     """Get active OpenClaw agent sessions"""
-    try:
-        # Run openclaw CLI to list sessions (via PowerShell)
-        result = subprocess.run(
-            ['powershell', '-Command', 'openclaw', 'sessions', 'list', '--json'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+    # Run openclaw CLI to list sessions (via PowerShell)
+    result = run_command(
+        'openclaw sessions list',
+        ['powershell', '-Command', 'openclaw', 'sessions', 'list', '--json'],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    
+    if result.returncode != 0:
+        # collect_all keeps the last good list and marks the section stale
+        raise RuntimeError(f"openclaw sessions list failed: {result.stderr.strip()}")
+    
+    sessions_data = json.loads(result.stdout)
+    sessions = []
+    
+    for session in sessions_data.get('sessions', []):
+        # Get display name or parse from key
+        name = session.get('displayName', None)
+        session_key = session.get('key', '')
+        channel = session.get('channel', 'unknown')
         
-        if result.returncode == 0:
-            sessions_data = json.loads(result.stdout)
-            sessions = []
-            
-            for session in sessions_data.get('sessions', []):
-                # Get display name or parse from key
-                name = session.get('displayName', None)
-                session_key = session.get('key', '')
-                channel = session.get('channel', 'unknown')
-                
-                # If no display name, parse from session key
-                if not name or name == 'Unknown':
-                    if ':discord:' in session_key:
-                        if ':channel:' in session_key:
-                            channel_id = session_key.split(':channel:')[-1]
-                            name = f'Discord Channel {channel_id[:8]}...'
-                            channel = 'discord'
-                        elif ':dm:' in session_key:
-                            name = 'Discord DM'
-                            channel = 'discord'
-                    elif ':telegram:' in session_key:
-                        if session_key.endswith('-1003146730450'):
-                            name = 'Telegram Retards v2'
-                        else:
-                            group_id = session_key.split(':')[-1]
-                            name = f'Telegram {group_id[:8]}...'
-                        channel = 'telegram'
-                    elif ':subagent:' in session_key:
-                        name = 'Subagent Session'
-                        channel = 'subagent'
-                    else:
-                        name = f'Session {session_key.split(":")[-1][:8]}...'
-                
-                sessions.append({
-                    'name': name,
-                    'channel': channel,
-                    'kind': session.get('kind', 'unknown'),
-                    'model': session.get('model', 'unknown'),
-                    'tokens': session.get('totalTokens', 0),
-                    'lastActive': format_timestamp(session.get('updatedAt', 0)),
-                    'sessionKey': session_key
-                })
-            
-            return sessions
-        else:
-            print(f"[WARN] openclaw sessions list failed: {result.stderr}")
-    except Exception as e:
-        print(f"[WARN] Could not get sessions: {e}")
+        # If no display name, parse from session key
+        if not name or name == 'Unknown':
+            if ':discord:' in session_key:
+                if ':channel:' in session_key:
+                    channel_id = session_key.split(':channel:')[-1]
+                    name = f'Discord Channel {channel_id[:8]}...'
+                    channel = 'discord'
+                elif ':dm:' in session_key:
+                    name = 'Discord DM'
+                    channel = 'discord'
+            elif ':telegram:' in session_key:
+                if session_key.endswith('-1003146730450'):
+                    name = 'Telegram Retards v2'
+                else:
+                    group_id = session_key.split(':')[-1]
+                    name = f'Telegram {group_id[:8]}...'
+                channel = 'telegram'
+            elif ':subagent:' in session_key:
+                name = 'Subagent Session'
+                channel = 'subagent'
+            else:
+                name = f'Session {session_key.split(":")[-1][:8]}...'
+        
+        sessions.append({
+            'name': name,
+            'channel': channel,
+            'kind': session.get('kind', 'unknown'),
+            'model': session.get('model', 'unknown'),
+            'tokens': session.get('totalTokens', 0),
+            'lastActive': format_timestamp(session.get('updatedAt', 0)),
+            'lastActiveAt': session.get('updatedAt') or None,
+            'sessionKey': session_key
+        })
     
-    # Fallback mock data
-    return [
-        { 'name': 'Discord #general', 'channel': 'discord', 'kind': 'group', 'model': 'claude-sonnet-4-5', 'tokens': 89000, 'lastActive': '2 min ago', 'sessionKey': 'agent:main:discord:channel:1468193294906425430' },
-        { 'name': 'Telegram Retards v2', 'channel': 'telegram', 'kind': 'group', 'model': 'claude-sonnet-4-5', 'tokens': 45000, 'lastActive': '1 hour ago', 'sessionKey': 'agent:main:telegram:-1003146730450' },
-    ]
+    record_token_usage(sessions)
+    return sessions
 
 def format_timestamp(ts_ms):
     """Format timestamp to relative time"""
@@ -269,16 +366,16 @@ def format_timestamp(ts_ms):
         from datetime import datetime
         dt = datetime.fromtimestamp(ts_ms / 1000)
         now = datetime.now()
-        diff = now - dt
+        seconds = (now - dt).total_seconds()
         
-        if diff.seconds < 60:
+        if seconds < 60:
             return 'Just now'
-        elif diff.seconds < 3600:
-            return f'{diff.seconds // 60} min ago'
-        elif diff.seconds < 86400:
-            return f'{diff.seconds // 3600} hours ago'
+        elif seconds < 3600:
+            return f'{int(seconds // 60)} min ago'
+        elif seconds < 86400:
+            return f'{int(seconds // 3600)} hours ago'
         else:
-            return f'{diff.days} days ago'
+            return f'{int(seconds // 86400)} days ago'
     except:
         return 'Unknown'
 
@@ -306,11 +403,10 @@ def calculate_stats(positions):
 def get_youtube_channel_stats(channel_id):
     """Fetch YouTube channel stats via YouTube Data API"""
     try:
-        import subprocess
-        
         # Use OpenClaw's YouTube integration (or fallback to CLI)
         # For now, return mock data - can be replaced with API calls
-        result = subprocess.run(
+        result = run_command(
+            'youtube channel stats',
             ['powershell', '-Command', 
              f'$ch = @{{channel_id = "{channel_id}"}}; '
              f'Write-Host "{{}}"'],
@@ -324,10 +420,79 @@ def get_youtube_channel_stats(channel_id):
     except:
         return {'subs': 0, 'views7d': 0, 'clipsToday': 0}
 
+# Every channel's row for the Clip Empire panel in one statement. Day bounds
+# are string ranges on created_at (instead of date(created_at) = ?) so the
+# indexes added by migrate_clip_empire.py can be used. latest_ts must be
+# computed on its own, so its MAX(created_at) stays one index seek per
+# channel rather than one per job row: the (no-op, channel_name is the key)
+# GROUP BY makes it an aggregate, which SQLite never flattens into a join.
+# AS MATERIALIZED would say the same but needs SQLite 3.35, newer than many
+# Windows Python builds. ROW_NUMBER breaks created_at ties.
+CLIP_EMPIRE_CHANNELS_SQL = """
+WITH todays AS (
+    SELECT channel_name, COUNT(*) AS n
+    FROM publish_jobs
+    WHERE status IN ('succeeded', 'queued', 'running')
+      AND created_at >= :day_start AND created_at < :day_end
+    GROUP BY channel_name
+),
+queued AS (
+    SELECT channel_name, COUNT(*) AS n
+    FROM publish_jobs
+    WHERE status = 'queued'
+    GROUP BY channel_name
+),
+latest_ts AS (
+    SELECT c.channel_name,
+           (SELECT MAX(created_at) FROM publish_jobs
+            WHERE channel_name = c.channel_name AND status = 'succeeded') AS created_at
+    FROM channels c
+    GROUP BY c.channel_name
+),
+latest AS (
+    SELECT p.channel_name,
+           substr(p.caption_text, 1, 50) AS last_title,
+           substr(p.created_at, 1, 16) AS last_ts,
+           ROW_NUMBER() OVER (PARTITION BY p.channel_name ORDER BY p.rowid DESC) AS rn
+    FROM latest_ts l
+    JOIN publish_jobs p
+      ON p.channel_name = l.channel_name
+     AND p.status = 'succeeded'
+     AND p.created_at = l.created_at
+)
+SELECT c.channel_name, c.status, c.daily_target,
+       COALESCE(t.n, 0), COALESCE(q.n, 0), l.last_title, l.last_ts
+FROM channels c
+LEFT JOIN todays t ON t.channel_name = c.channel_name
+LEFT JOIN queued q ON q.channel_name = c.channel_name
+LEFT JOIN latest l ON l.channel_name = c.channel_name AND l.rn = 1
+ORDER BY c.status DESC, c.channel_name
+"""
+
+# Read-only connections kept open across daemon ticks, keyed by DB path
+_clip_empire_conns = {}
+
+def get_clip_empire_connection(db):
+    """Read-only, query-only connection to the Clip Empire DB"""
+    conn = _clip_empire_conns.get(db)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{pathname2url(db)}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        _clip_empire_conns[db] = conn
+    return conn
+
+def close_clip_empire_connection(db):
+    """Drop a cached connection so the next read reopens it"""
+    conn = _clip_empire_conns.pop(db, None)
+    if conn is not None:
+        try:
+            conn.close()
+        except:
+            pass
+
 def get_clip_empire_stats():
     """Read Clip Empire channel stats + creator profiles from the DB and config."""
-    import sqlite3 as _sq
-    DB = os.path.join(WORKSPACE, 'ventures', 'clip_empire', 'data', 'clip_empire.db')
+    DB = clip_empire_db_path()
     SOURCES_PATH = os.path.join(WORKSPACE, 'ventures', 'clip_empire', 'engine', 'config', 'sources.py')
 
     # Channel niche labels
@@ -356,43 +521,19 @@ def get_clip_empire_stats():
     }
 
     channels = []
-    today = datetime.now().strftime('%Y-%m-%d')
+    now = datetime.now()
+    day_start = now.strftime('%Y-%m-%d')
+    day_end = (now + timedelta(days=1)).strftime('%Y-%m-%d')
 
     try:
-        conn = _sq.connect(DB)
-        rows = conn.execute(
-            "SELECT channel_name, status, daily_target FROM channels ORDER BY status DESC, channel_name"
-        ).fetchall()
-
-        for ch_name, status, daily_target in rows:
-            niche = NICHE_MAP.get(ch_name, 'Unknown')
-            # Jobs today (succeeded + queued)
-            today_count = conn.execute(
-                """SELECT COUNT(*) FROM publish_jobs
-                   WHERE channel_name=? AND date(created_at)=?
-                   AND status IN ('succeeded','queued','running')""",
-                (ch_name, today)
-            ).fetchone()[0]
-
-            # Last succeeded job
-            last_row = conn.execute(
-                """SELECT caption_text, created_at FROM publish_jobs
-                   WHERE channel_name=? AND status='succeeded'
-                   ORDER BY created_at DESC LIMIT 1""",
-                (ch_name,)
-            ).fetchone()
-            last_title = last_row[0][:50] if last_row else None
-            last_ts = last_row[1][:16] if last_row else None
-
-            # Queued jobs
-            queued = conn.execute(
-                "SELECT COUNT(*) FROM publish_jobs WHERE channel_name=? AND status='queued'",
-                (ch_name,)
-            ).fetchone()[0]
+        conn = get_clip_empire_connection(DB)
+        with timing.span('clip empire channels', 'query'):
+            rows = conn.execute(CLIP_EMPIRE_CHANNELS_SQL, {'day_start': day_start, 'day_end': day_end}).fetchall()
 
+        for ch_name, status, daily_target, today_count, queued, last_title, last_ts in rows:
             channels.append({
                 'name': ch_name,
-                'niche': niche or NICHE_MAP.get(ch_name, 'Unknown'),
+                'niche': NICHE_MAP.get(ch_name, 'Unknown'),
                 'status': status,
                 'daily_target': daily_target or 0,
                 'today_count': today_count,
@@ -401,9 +542,11 @@ def get_clip_empire_stats():
                 'last_ts': last_ts,
                 'creators': CREATOR_MAP.get(ch_name, []),
             })
-        conn.close()
-    except Exception as e:
-        print(f"[WARN] Clip Empire DB read failed: {e}")
+    except Exception:
+        # Reopen next time; collect_all keeps the last good section and
+        # marks it stale
+        close_clip_empire_connection(DB)
+        raise
 
     active = [c for c in channels if c['status'] == 'active']
     total_today = sum(c['today_count'] for c in channels)
@@ -426,45 +569,60 @@ def get_clip_empire_stats():
 
 def get_content_engine_stats():
     """Wrapper — now delegates to Clip Empire DB reader."""
+    return get_clip_empire_stats()
+
+def read_youtube_quota():
+    """YouTube quota units used, from the clip engine's quota file"""
+    try:
+        # Check if we track YouTube quota somewhere
+        quota_file = youtube_quota_path()
+        if os.path.exists(quota_file):
+            with open(quota_file, 'r') as f:
+                return int(f.read().strip())
+    except:
+        pass
+    return 0
+
+read_youtube_quota_memo = memoized(
+    'ytQuota', read_youtube_quota, lambda: file_fingerprint(youtube_quota_path()))
+
+_ledger = None
+
+def get_token_ledger():
+    """The persistent token ledger, opened on first use"""
+    global _ledger
+    if _ledger is None:
+        _ledger = TokenLedger(TOKEN_LEDGER_FILE)
+    return _ledger
+
+def record_token_usage(sessions):
+    """Add the token deltas of a freshly listed set of sessions to the ledger"""
     try:
-        return get_clip_empire_stats()
+        with timing.span('token ledger record', 'query'):
+            get_token_ledger().record(sessions)
     except Exception as e:
-        print(f"[WARN] Could not get content engine stats: {e}")
-        return {
-            'channels': [],
-            'active_count': 0,
-            'total_count': 0,
-            'total_today': 0,
-            'total_queued': 0,
-            'total_target': 0,
-            'arc_clips_today': 0,
-            'arc_views': 0,
-            'arc_subs': 0,
-            'rage_clips_today': 0,
-            'rage_views': 0,
-            'rage_subs': 0,
-        }
+        print(f"[WARN] Could not record token usage: {e}")
 
 def get_api_usage(sessions):
     """Get real API usage data"""
     usage = {}
     
-    # Anthropic API - sum all session tokens
-    total_tokens = sum(s.get('tokens', 0) or 0 for s in sessions if isinstance(s, dict))
-    usage['anthropicTokens'] = total_tokens
-    usage['anthropicPercent'] = min((total_tokens / 200000) * 100, 100) if total_tokens > 0 else 0
+    # Anthropic API - month-to-date from the token ledger, which keeps
+    # counting sessions after they expire
+    try:
+        with timing.span('token ledger summary', 'query'):
+            ledger = get_token_ledger().summary()
+        usage['tokenLedger'] = ledger
+        usage['anthropicTokens'] = ledger['monthToDate']
+        usage['anthropicPercent'] = ledger['quotaPercent']
+    except Exception as e:
+        print(f"[WARN] Could not read token ledger: {e}")
+        total_tokens = sum(s.get('tokens', 0) or 0 for s in sessions if isinstance(s, dict))
+        usage['anthropicTokens'] = total_tokens
+        usage['anthropicPercent'] = min((total_tokens / 200000) * 100, 100) if total_tokens > 0 else 0
     
     # YouTube API - try to get from quota file or config
-    try:
-        # Check if we track YouTube quota somewhere
-        quota_file = os.path.join(WORKSPACE, 'ventures', 'clip_engine', 'youtube_quota.txt')
-        if os.path.exists(quota_file):
-            with open(quota_file, 'r') as f:
-                usage['ytQuotaUsed'] = int(f.read().strip())
-        else:
-            usage['ytQuotaUsed'] = 0
-    except:
-        usage['ytQuotaUsed'] = 0
+    usage['ytQuotaUsed'] = read_youtube_quota_memo()
     
     # OpenAI API - estimate from usage (could integrate with OpenAI API)
     usage['openaiUsage'] = 15  # Mock for now
@@ -477,70 +635,244 @@ def get_api_usage(sessions):
     
     return usage
 
+_sampler = None
+
+def get_machine_sampler():
+    """The background machine-health sampler, started on first use"""
+    global _sampler
+    if _sampler is None:
+        _sampler = MachineSampler()
+        _sampler.start()
+    return _sampler
+
 def get_machine_health():
     """Collect machine health metrics"""
+    import psutil
+    
+    # CPU, load, network, disk I/O and process counts come from the
+    # background sampler, so this never waits for a measurement
+    sample = get_machine_sampler().latest()
+    
+    # Memory
+    mem = psutil.virtual_memory()
+    mem_used_gb = mem.used / (1024**3)
+    mem_total_gb = mem.total / (1024**3)
+    mem_percent = mem.percent
+    
+    # Disk (C: on the Windows box, / elsewhere)
+    disk = psutil.disk_usage('C:\\' if os.name == 'nt' else '/')
+    disk_used_gb = disk.used / (1024**3)
+    disk_total_gb = disk.total / (1024**3)
+    disk_percent = disk.percent
+    
+    net_rx = sample.get('netRxBytesPerSec', 0)
+    net_tx = sample.get('netTxBytesPerSec', 0)
+    
+    return {
+        'cpuPercent': sample.get('cpuPercent', 0),
+        'cpuPerCore': sample.get('cpuPerCore', []),
+        'loadAvg': sample.get('loadAvg', []),
+        'memUsedGB': mem_used_gb,
+        'memTotalGB': mem_total_gb,
+        'memPercent': mem_percent,
+        'diskUsedGB': disk_used_gb,
+        'diskTotalGB': disk_total_gb,
+        'diskPercent': disk_percent,
+        'diskReadBytesPerSec': round(sample.get('diskReadBytesPerSec', 0)),
+        'diskWriteBytesPerSec': round(sample.get('diskWriteBytesPerSec', 0)),
+        # KB/s, as the dashboard expects
+        'netSpeed': round((net_rx + net_tx) / 1024, 1),
+        'netRxBytesPerSec': round(net_rx),
+        'netTxBytesPerSec': round(net_tx),
+        'processes': sample.get('processes', 0),
+        'pythonProcesses': sample.get('pythonProcesses', 0)
+    }
+
+# Section name -> (collector, deadline in seconds, fallback when nothing good is known)
+COLLECTORS = {
+    'positions': (memoized('positions', parse_trades, lambda: file_fingerprint(trades_path())), 5, []),
+    'prices': (get_prices, 5, {}),
+    'bots': (get_cron_bots, 10, []),
+    'sessions': (get_active_sessions, 10, []),
+    'machine': (get_machine_health, 5, {}),
+    # Today's counts roll over at midnight even if the DB doesn't change
+    'content': (memoized('content', get_content_engine_stats, lambda: [
+        datetime.now().strftime('%Y-%m-%d'),
+        file_fingerprint(clip_empire_db_path(), clip_empire_db_path() + '-wal'),
+    ]), 10, {}),
+    'folders': (get_folder_sizes, 60, {}),
+}
+
+# Refresh interval in seconds of every section in --daemon mode
+DAEMON_INTERVALS = {
+    'machine': 2,
+    'positions': 10,
+    'prices': 5,
+    'sessions': 15,
+    'bots': 30,
+    'content': 30,
+    'folders': 3600,
+}
+
+# Sections the workspace watcher refreshes on change instead of on a timer,
+# with the workspace-relative paths they depend on ('folders' is marked
+# dirty by any change)
+WATCHED_SECTIONS = {
+    'positions': [os.path.join("memory", "trades.md")],
+    'folders': [],
+}
+
+# With a watcher running, the daemon checks for changes this often (seconds)
+WATCH_POLL = 1
+
+_collector_metrics = None
+# Counters saved in collector_state.json by the previous run, restored into
+# _collector_metrics so they keep counting up across one-shot/cron runs
+# (Prometheus reads a reset as a counter restart)
+_saved_metrics = None
+# Key of those counters in collector_state.json, next to the sections
+METRICS_STATE_KEY = '_collectorMetrics'
+# Set by --profile for the duration of one run
+_profiler = None
+
+def get_collector_metrics(collectors):
+    """Duration/failure counters for the collectors, published in _meta"""
+    global _collector_metrics
+    if _collector_metrics is None or _collector_metrics.names != list(collectors):
+        _collector_metrics = CollectorMetrics(collectors)
+        _collector_metrics.restore(_saved_metrics)
+    return _collector_metrics
+
+def instrument(name, fn, metrics):
+    """fn with its timing spans, metrics and (under --profile) profiling"""
+    fn = timing.timed(name, fn)
+    if _profiler is not None:
+        fn = _profiler.wrap(fn)
+    return metrics.wrap(name, fn)
+
+def start_collector(name, fn):
+    """Run fn on its own daemon thread; returns a Future of its result.
+
+    ThreadPoolExecutor's workers are joined when the interpreter exits, so a
+    collector that missed its deadline would still hold the process up until
+    it finished. Daemon threads are not waited for.
+    """
+    future = Future()
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=run, name=f'collector-{name}', daemon=True).start()
+    return future
+
+def load_last_good():
+    """Load the last good value of every section from the previous run"""
+    global _saved_metrics
     try:
-        import psutil
-        
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        
-        # Memory
-        mem = psutil.virtual_memory()
-        mem_used_gb = mem.used / (1024**3)
-        mem_total_gb = mem.total / (1024**3)
-        mem_percent = mem.percent
-        
-        # Disk (C:)
-        disk = psutil.disk_usage('C:\\')
-        disk_used_gb = disk.used / (1024**3)
-        disk_total_gb = disk.total / (1024**3)
-        disk_percent = disk.percent
-        
-        # Network speed (would need tracking over time for accuracy)
-        net_speed = 0
-        
-        # Python processes
-        python_procs = sum(1 for p in psutil.process_iter(['name']) if 'python' in p.info['name'].lower())
-        
-        return {
-            'cpuPercent': cpu_percent,
-            'memUsedGB': mem_used_gb,
-            'memTotalGB': mem_total_gb,
-            'memPercent': mem_percent,
-            'diskUsedGB': disk_used_gb,
-            'diskTotalGB': disk_total_gb,
-            'diskPercent': disk_percent,
-            'netSpeed': net_speed,
-            'pythonProcesses': python_procs
-        }
-    except Exception as e:
-        print(f"[WARN] Could not get machine health: {e}")
+        with open(STATE_FILE, 'r') as f:
+            last_good = json.load(f)
+    except:
         return {}
+    _saved_metrics = last_good.pop(METRICS_STATE_KEY, None)
+    # State files from before collectedAt was epoch ms hold ISO strings
+    for entry in last_good.values():
+        if isinstance(entry.get('collectedAt'), str):
+            try:
+                entry['collectedAt'] = round(datetime.fromisoformat(entry['collectedAt']).timestamp() * 1000)
+            except ValueError:
+                entry['collectedAt'] = None
+    return last_good
+
+def save_last_good(last_good):
+    """Persist the last good value of every section (and the collector
+    counters) for the next run"""
+    state = dict(last_good)
+    if _collector_metrics is not None:
+        state[METRICS_STATE_KEY] = _collector_metrics.export()
+    try:
+        with open(STATE_FILE, 'w') as f:
+            json.dump(state, f)
+    except Exception as e:
+        print(f"[WARN] Could not save collector state: {e}")
+
+def collect_all(collectors=None, last_good=None):
+    """Run every collector concurrently, each against its own deadline.
+
+    A collector that misses its deadline (or raises) does not hold up the
+    snapshot: its section falls back to the last good value and is marked
+    stale. Returns (results, sections) where sections carries per-section
+    freshness metadata for the snapshot.
+    """
+    if collectors is None:
+        collectors = COLLECTORS
+    if last_good is None:
+        last_good = load_last_good()
+    seed_memo(last_good)
+
+    results = {}
+    sections = {}
+    metrics = get_collector_metrics(collectors)
+    start = time.monotonic()
+    futures = {name: start_collector(name, instrument(name, fn, metrics))
+               for name, (fn, _, _) in collectors.items()}
+
+    for name, (fn, deadline, fallback) in collectors.items():
+        # Deadlines are absolute from the start, so waiting in order
+        # never adds one collector's wait on top of another's
+        remaining = max(0, start + deadline - time.monotonic())
+        try:
+            value = futures[name].result(timeout=remaining)
+        except CollectorTimeout:
+            print(f"[WARN] {name} collector missed its {deadline}s deadline")
+            metrics.fail(name)
+        except Exception as e:
+            print(f"[WARN] {name} collector failed: {e}")
+        else:
+            collected_at = epoch_ms()
+            results[name] = value
+            sections[name] = {'stale': False, 'collectedAt': collected_at}
+            last_good[name] = {'value': value, 'collectedAt': collected_at,
+                               'fingerprint': memo_fingerprint(name)}
+            continue
+
+        previous = last_good.get(name)
+        if previous:
+            results[name] = previous['value']
+            sections[name] = {'stale': True, 'collectedAt': previous['collectedAt']}
+        else:
+            results[name] = fallback
+            sections[name] = {'stale': True, 'collectedAt': None}
+
+    save_last_good(last_good)
+    return results, sections
+
+def build_snapshot(results, sections, duration_ms=0):
+    """Assemble the data.json object from collector results"""
+    # Marked to market on every snapshot: prices move without trades.md changing
+    positions = revalue(results['positions'], results.get('prices') or {})
+    bots = results['bots']
+    sessions = results['sessions']
+    machine = results['machine']
+    content_stats = results['content']
+    workspace_size = results['folders'].get('workspaceSize', 0)
+    data_size = results['folders'].get('dataSize', 0)
 
-def main():
-    print("Generating dashboard data...")
-    
-    # Parse real data
-    positions = parse_trades()
-    bots = get_cron_bots()
-    sessions = get_active_sessions()
     stats = calculate_stats(positions)
     api_usage = get_api_usage(sessions)
-    machine = get_machine_health()
-    content_stats = get_content_engine_stats()
-    
-    # System health
-    workspace_size = get_folder_size(WORKSPACE)
-    data_size = get_folder_size(os.path.join(WORKSPACE, "data"))
     
     # Build data object
     data = {
         "timestamp": datetime.now().isoformat(),
+        "generatedAt": epoch_ms(),
         "bots": bots,
         "positions": positions,
         "sessions": sessions,
         "machine": machine,
+        "recent_files": results['folders'].get('recentFiles', []),
+        "token_usage": api_usage.get('tokenLedger', {}),
         "clip_empire": {
             "channels": content_stats.get('channels', []),
             "active_count": content_stats.get('active_count', 0),
@@ -573,21 +905,254 @@ def main():
             'monthlyTarget': 10000,
             'workspaceSize': workspace_size,
             'dataSize': data_size,
+        },
+        "_meta": {
+            "durationMs": duration_ms,
+            # Copies, so later updates can't reach into published snapshots
+            "sections": {name: dict(info) for name, info in sections.items()},
+            "stale": [name for name, info in sections.items() if info['stale']],
+            "memo": {name: dict(counters) for name, counters in MEMO_STATS.items()},
+            "collectors": _collector_metrics.export() if _collector_metrics else None,
+            # Latest run of each collector, with its subprocess/query/walk spans
+            "timings": timing.export(),
         }
     }
+    return data
+
+# History metric name -> path to its value in the snapshot
+HISTORY_METRICS = {
+    'cpuPercent': ('machine', 'cpuPercent'),
+    'memPercent': ('machine', 'memPercent'),
+    'diskPercent': ('machine', 'diskPercent'),
+    'netSpeed': ('machine', 'netSpeed'),
+    'netRxBytesPerSec': ('machine', 'netRxBytesPerSec'),
+    'netTxBytesPerSec': ('machine', 'netTxBytesPerSec'),
+    'diskReadBytesPerSec': ('machine', 'diskReadBytesPerSec'),
+    'diskWriteBytesPerSec': ('machine', 'diskWriteBytesPerSec'),
+    'pythonProcesses': ('machine', 'pythonProcesses'),
+    'dailyPnl': ('stats', 'dailyPnl'),
+    'winRate': ('stats', 'winRate'),
+    'positionCount': ('stats', 'positionCount'),
+    'anthropicTokens': ('stats', 'anthropicTokens'),
+    'tokensLastHour': ('token_usage', 'lastHour'),
+    'tokenBurnPerHour': ('token_usage', 'burnPerHour'),
+    'ytQuotaUsed': ('stats', 'ytQuotaUsed'),
+    'workspaceSize': ('stats', 'workspaceSize'),
+    'dataSize': ('stats', 'dataSize'),
+    'clipsToday': ('clip_empire', 'total_today'),
+    'clipsQueued': ('clip_empire', 'total_queued'),
+}
+
+_history = None
+
+def record_history(data):
+    """Append the snapshot's numeric metrics to the history store"""
+    global _history
+    metrics = {}
+    for name, path in HISTORY_METRICS.items():
+        value = data
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            metrics[name] = value
+
+    try:
+        if _history is None:
+            _history = HistoryStore(HISTORY_FILE)
+        with timing.span('history append', 'query'):
+            _history.append(metrics)
+    except Exception as e:
+        print(f"[WARN] Could not record history: {e}")
+
+_delta_log = None
+
+def write_snapshot(data):
+    """Publish the snapshot to data.json and its delta to deltas.json"""
+    global _delta_log
+    if _delta_log is None:
+        _delta_log = DeltaLog(OUTPUT_FILE, DELTA_FILE)
+    deltas = _delta_log.next(data)
+
+    # Minified, atomically replaced, with .gz/.br siblings
+    publish_snapshot(OUTPUT_FILE, data)
+    publish_json(DELTA_FILE, deltas)
+    record_history(data)
+
+def main(profile=None):
+    """Generate data.json once; with profile, also write profile.pstats/.collapsed"""
+    global _profiler
+    print("Generating dashboard data...")
+    if profile:
+        _profiler = Profiler()
+        _profiler.start()
+    started = time.monotonic()
+    # First counter reading now, so the machine section's rates cover the
+    # collectors' run (at least MIN_WINDOW) rather than a few milliseconds
+    get_machine_sampler()
+    
+    # Run every collector at once
+    results, sections = collect_all()
+    data = build_snapshot(results, sections, round((time.monotonic() - started) * 1000))
+    write_snapshot(data)
     
-    # Write to file
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    if profile:
+        _profiler.stop()
+        stats = _profiler.write(profile)
+        _profiler = None
+        print(f"[OK] Wrote {profile}.pstats and {profile}.collapsed")
+        stats.sort_stats('cumulative').print_stats(15)
+    
+    positions = data['positions']
+    bots = data['bots']
+    sessions = data['sessions']
+    machine = data['machine']
+    stats = data['stats']
+    workspace_size = stats['workspaceSize']
+    data_size = stats['dataSize']
     
     print(f"[OK] Generated {OUTPUT_FILE}")
     print(f"  - {len(positions)} positions")
     print(f"  - {len(bots)} bots")
     print(f"  - {len(sessions)} sessions")
-    print(f"  - API: {api_usage.get('anthropicTokens', 0):,} Anthropic tokens, {api_usage.get('ytQuotaUsed', 0)} YT quota")
+    print(f"  - API: {stats.get('anthropicTokens', 0):,} Anthropic tokens, {stats.get('ytQuotaUsed', 0)} YT quota")
     print(f"  - Machine: CPU {machine.get('cpuPercent', 0):.1f}%, RAM {machine.get('memPercent', 0):.1f}%, {machine.get('pythonProcesses', 0)} Python procs")
     print(f"  - Workspace: {workspace_size} MB")
     print(f"  - Data: {data_size} MB")
 
+def next_tick(interval, now):
+    """Next wall-clock time that is a whole multiple of interval"""
+    return (math.floor(now / interval) + 1) * interval
+
+def start_watcher():
+    """Start the inotify workspace watcher, or return None to keep polling"""
+    global _watcher
+    if not workspace_watcher.available():
+        return None
+    try:
+        watcher = workspace_watcher.WorkspaceWatcher(WORKSPACE, {
+            name: [os.path.join(WORKSPACE, p) for p in paths]
+            for name, paths in WATCHED_SECTIONS.items()
+        })
+        watcher.start()
+    except Exception as e:
+        print(f"[WARN] Could not start workspace watcher, polling instead: {e}")
+        return None
+    _watcher = watcher
+    return watcher
+
+def run_daemon(intervals=None, collectors=None, watch=True):
+    """Stay resident and refresh every section on its own schedule.
+
+    Ticks are aligned to whole multiples of each section's interval and are
+    computed from the schedule rather than from when the last run finished,
+    so they don't drift. A tick that comes round while the previous run of
+    that section is still going is skipped rather than queued. data.json is
+    rewritten as soon as any section refreshes.
+
+    Where inotify is available the sections in WATCHED_SECTIONS ignore
+    their interval and refresh only when the watcher reports a change.
+    """
+    if intervals is None:
+        intervals = DAEMON_INTERVALS
+    if collectors is None:
+        collectors = COLLECTORS
+
+    get_machine_sampler()
+    last_good = load_last_good()
+    seed_memo(last_good)
+    results = {}
+    sections = {}
+    for name, (fn, deadline, fallback) in collectors.items():
+        previous = last_good.get(name)
+        results[name] = previous['value'] if previous else fallback
+        sections[name] = {'stale': True, 'collectedAt': previous['collectedAt'] if previous else None}
+
+    lock = threading.Lock()
+    metrics = get_collector_metrics(collectors)
+    running = {}
+
+    def publish(name, started, future):
+        duration_ms = round((time.monotonic() - started) * 1000)
+        try:
+            value = future.result()
+        except Exception as e:
+            print(f"[WARN] {name} collector failed: {e}")
+            with lock:
+                sections[name]['stale'] = True
+            return
+
+        collected_at = epoch_ms()
+        with lock:
+            results[name] = value
+            sections[name] = {'stale': False, 'collectedAt': collected_at}
+            last_good[name] = {'value': value, 'collectedAt': collected_at,
+                               'fingerprint': memo_fingerprint(name)}
+            try:
+                write_snapshot(build_snapshot(results, sections, duration_ms))
+                save_last_good(last_good)
+            except Exception as e:
+                print(f"[WARN] Could not write snapshot after {name} refresh: {e}")
+
+    watcher = start_watcher() if watch else None
+    print(f"Collector daemon started ({len(collectors)} sections)")
+    due = {name: time.time() for name in collectors}
+    try:
+        while True:
+            now = time.time()
+            for name, (fn, deadline, fallback) in collectors.items():
+                on_tick = now >= due[name]
+                if on_tick:
+                    due[name] = next_tick(intervals[name], now)
+                event_driven = watcher is not None and name in WATCHED_SECTIONS
+                if event_driven:
+                    if not watcher.is_dirty(name):
+                        continue
+                elif not on_tick:
+                    continue
+
+                in_flight = running.get(name)
+                if in_flight and not in_flight[1].done():
+                    if time.monotonic() - in_flight[0] > deadline and not in_flight[2]:
+                        print(f"[WARN] {name} collector missed its {deadline}s deadline")
+                        # Counted once per run, however many ticks it overruns
+                        metrics.fail(name)
+                        running[name] = (*in_flight[:2], True)
+                        with lock:
+                            sections[name]['stale'] = True
+                    continue
+
+                if event_driven:
+                    watcher.take_dirty(name)
+                started = time.monotonic()
+                future = start_collector(name, instrument(name, fn, metrics))
+                running[name] = (started, future, False)
+                future.add_done_callback(functools.partial(publish, name, started))
+
+            wake = min(due.values())
+            if watcher is not None:
+                wake = min(wake, now + WATCH_POLL)
+            time.sleep(max(0, wake - time.time()))
+    except KeyboardInterrupt:
+        print("Collector daemon stopped")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate data.json for OpenClaw Dashboard")
+    parser.add_argument('--daemon', action='store_true',
+                        help="stay resident and refresh each section on its own interval")
+    parser.add_argument('--profile', nargs='?', const='profile', metavar='PREFIX',
+                        help="profile one run into PREFIX.pstats and PREFIX.collapsed (default: profile)")
+    parser.add_argument('--trace', action='store_true',
+                        help="log the wall time of every subprocess, query and collector")
+    args = parser.parse_args()
+
+    if args.trace:
+        timing.enable_trace()
+    if args.daemon:
+        if args.profile:
+            print("[WARN] --profile covers a single run and is ignored with --daemon")
+        run_daemon()
+    else:
+        main(args.profile)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Time-series history of the dashboard's numeric metrics
+
+Every snapshot overwrites the previous data.json, so trends (P&L over the
+week, CPU, tokens, clip counts) have to be kept somewhere else. This is an
+embedded SQLite store: each snapshot's metrics are appended as raw samples
+and folded straight into 1-minute, 1-hour and 1-day buckets (min, max,
+mean, last) with upserts, so rollups are always current and never need a
+batch job. Each resolution has its own retention so the file stays
+bounded, and range queries are answered from the finest resolution that
+still covers the window within a point budget.
+"""
+
+import sqlite3
+import threading
+import time
+
+# (name, bucket size in seconds, retention in seconds); raw samples have no bucket
+RESOLUTIONS = [
+    ('raw', 0, 6 * 3600),
+    ('1m', 60, 7 * 86400),
+    ('1h', 3600, 90 * 86400),
+    ('1d', 86400, 5 * 365 * 86400),
+]
+
+# Old samples and buckets are deleted at most this often (seconds)
+PRUNE_INTERVAL = 300
+
+# Default upper bound on the points a range query returns
+MAX_POINTS = 500
+
+# Assumed spacing of raw samples when sizing a query (seconds)
+RAW_SPACING = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_metric_ts ON samples(metric, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    step INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    vmin REAL NOT NULL,
+    vmax REAL NOT NULL,
+    vsum REAL NOT NULL,
+    n INTEGER NOT NULL,
+    vlast REAL NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (step, metric, bucket)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_SQL = """
+INSERT INTO rollups (step, metric, bucket, vmin, vmax, vsum, n, vlast, last_ts)
+VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+ON CONFLICT (step, metric, bucket) DO UPDATE SET
+    vmin = min(vmin, excluded.vmin),
+    vmax = max(vmax, excluded.vmax),
+    vsum = vsum + excluded.vsum,
+    n = n + 1,
+    vlast = CASE WHEN excluded.last_ts >= last_ts THEN excluded.vlast ELSE vlast END,
+    last_ts = max(last_ts, excluded.last_ts)
+"""
+
+class HistoryStore:
+    """Append-only metric history with incremental rollups"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.pruned_at = 0
+
+    def close(self):
+        """Close the underlying connection"""
+        with self.lock:
+            self.conn.close()
+
+    def append(self, metrics, ts=None):
+        """Record one sample of every numeric metric in the metrics dict"""
+        ts = time.time() if ts is None else ts
+        samples = [
+            (name, float(value)) for name, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+        if not samples:
+            return
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO samples (metric, ts, value) VALUES (?, ?, ?)",
+                [(name, ts, value) for name, value in samples])
+            for _, step, _ in RESOLUTIONS[1:]:
+                bucket = int(ts // step) * step
+                self.conn.executemany(ROLLUP_SQL, [
+                    (step, name, bucket, value, value, value, value, ts)
+                    for name, value in samples
+                ])
+            if ts - self.pruned_at > PRUNE_INTERVAL:
+                self.prune(ts)
+
+    def prune(self, now):
+        """Drop samples and buckets that are past their resolution's retention"""
+        _, _, raw_retention = RESOLUTIONS[0]
+        self.conn.execute("DELETE FROM samples WHERE ts < ?", (now - raw_retention,))
+        for _, step, retention in RESOLUTIONS[1:]:
+            self.conn.execute("DELETE FROM rollups WHERE step = ? AND bucket < ?",
+                              (step, now - retention))
+        self.pruned_at = now
+
+    def pick_resolution(self, start, end, max_points=MAX_POINTS):
+        """Finest resolution that still holds start and fits the window in max_points.
+
+        Raw samples arrive every few seconds in --daemon mode, so they only
+        qualify for windows shorter than max_points * RAW_SPACING.
+        """
+        now = time.time()
+        window = max(end - start, 1)
+        for name, step, retention in RESOLUTIONS:
+            spacing = step or RAW_SPACING
+            if start >= now - retention and window / spacing <= max_points:
+                return name, step
+        name, step, _ = RESOLUTIONS[-1]
+        return name, step
+
+    def query(self, metric, start, end=None, max_points=MAX_POINTS):
+        """Points for metric between start and end (epoch seconds).
+
+        Returns {'resolution': name, 'points': [{'t', 'min', 'max', 'mean',
+        'last'}, ...]}; for raw samples all four values are the sample.
+        """
+        end = time.time() if end is None else end
+        name, step = self.pick_resolution(start, end, max_points)
+
+        with self.lock:
+            if step == 0:
+                rows = self.conn.execute(
+                    "SELECT ts, value, value, value, value FROM samples "
+                    "WHERE metric = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                    (metric, start, end)).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT bucket, vmin, vmax, vsum / n, vlast FROM rollups "
+                    "WHERE step = ? AND metric = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket",
+                    (step, metric, int(start // step) * step, end)).fetchall()
+
+        return {
+            'resolution': name,
+            'points': [
+                {'t': t, 'min': vmin, 'max': vmax, 'mean': mean, 'last': last}
+                for t, vmin, vmax, mean, last in rows
+            ],
+        }
+
+    def metrics(self):
+        """Names of every metric with history"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT metric FROM rollups WHERE step = ?", (RESOLUTIONS[-1][1],))]
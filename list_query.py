@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Field selection, filtering, sorting and keyset pagination for API lists
+
+    ?fields=coin,pnl            only these keys of each row (* for all)
+    ?filter=direction=LONG      rows whose field equals the value
+                                (case-insensitive); conditions are separated
+                                by ',' and '!=' negates one
+    ?sort=-pnl,coin             sort keys, '-' for descending
+    ?limit=50                   at most this many rows, plus a nextCursor
+    ?cursor=...                 the page after the one that returned it
+
+Pages are keyset-based: the cursor carries the sort values of the last
+row sent (with the row id as a tie-breaker), so a row added or removed
+between requests never shifts a page or repeats a row.
+"""
+
+import base64
+import json
+from bisect import bisect_right
+
+# Largest page a client can ask for
+MAX_LIMIT = 500
+
+class QueryError(ValueError):
+    """A malformed list query parameter"""
+
+def parse_filters(spec):
+    """[(field, negate, lowercase value)] from 'status=error,direction!=SHORT'"""
+    filters = []
+    for condition in filter(None, (spec or '').split(',')):
+        field, op, value = condition.partition('=')
+        negate = field.endswith('!')
+        field = field.rstrip('!').strip()
+        if not op or not field:
+            raise QueryError(f"filter must look like field=value, got {condition!r}")
+        filters.append((field, negate, value.strip().lower()))
+    return filters
+
+def parse_sort(spec):
+    """[(field, descending)] from '-pnl,coin'"""
+    return [(field.lstrip('-'), field.startswith('-'))
+            for field in filter(None, (spec or '').split(','))]
+
+def matches(row, filters):
+    for field, negate, value in filters:
+        if (str(row.get(field)).lower() == value) == negate:
+            return False
+    return True
+
+class Descending:
+    """Inverts the order of a sort key element"""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+def comparable(value):
+    """Sort key for a JSON value: numbers, then strings, then None"""
+    if value is None:
+        return (2, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+def make_key(values, sort):
+    return tuple(Descending(comparable(v)) if desc else comparable(v)
+                 for v, (_, desc) in zip(values, sort))
+
+def encode_cursor(sort, values):
+    raw = json.dumps([[f"-{f}" if d else f for f, d in sort], values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, sort):
+    """Sort values of the last row of the previous page"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        spec, values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise QueryError("cursor is not valid")
+    if spec != [f"-{f}" if d else f for f, d in sort] or len(values) != len(sort):
+        raise QueryError("cursor belongs to a different sort order")
+    return values
+
+def project(row, fields):
+    if fields is None:
+        return row
+    return {k: row[k] for k in fields if k in row}
+
+def query_rows(rows, args, id_of, summary_fields=None):
+    """One page of rows for the query args.
+
+    id_of(row) gives a unique, JSON-serializable id used to break sort
+    ties. Rows are projected to summary_fields (None for every field)
+    unless ?fields= asks otherwise. Returns {'items', 'total', 'nextCursor'}
+    where total counts the filtered rows before paging; raises QueryError.
+    """
+    filters = parse_filters(args.get('filter'))
+    sort = parse_sort(args.get('sort'))
+    fields = args.get('fields')
+    if fields == '*':
+        fields = None
+    elif fields:
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    else:
+        fields = summary_fields
+
+    try:
+        limit = min(int(args.get('limit', MAX_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        raise QueryError("limit must be an integer")
+    if limit < 1:
+        raise QueryError("limit must be at least 1")
+
+    # The row id is always the last sort key, so the order is total
+    sort = sort + [('@id', False)]
+    def values_of(row):
+        return [id_of(row) if f == '@id' else row.get(f) for f, _ in sort]
+
+    decorated = sorted(((make_key(values_of(row), sort), row)
+                        for row in rows if matches(row, filters)),
+                       key=lambda pair: pair[0])
+    start = 0
+    if args.get('cursor'):
+        after = make_key(decode_cursor(args['cursor'], sort), sort)
+        start = bisect_right([key for key, _ in decorated], after)
+
+    page = [row for _, row in decorated[start:start + limit]]
+    next_cursor = None
+    if page and start + limit < len(decorated):
+        next_cursor = encode_cursor(sort, values_of(page[-1]))
+    return {
+        'items': [project(row, fields) for row in page],
+        'total': len(decorated),
+        'nextCursor': next_cursor,
+    }
+
+def find_row(rows, id_of, item_id):
+    """The row whose id (compared as a string) is item_id, or None"""
+    for row in rows:
+        if str(id_of(row)) == item_id:
+            return row
+    return None
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Background sampler for machine health
+
+psutil's one-shot calls either block (cpu_percent(interval=...)) or have
+nothing to compare against (network and disk counters only make sense as
+rates). The sampler reads the raw counters on its own thread every few
+seconds, turns consecutive readings into deltas kept in a small ring, and
+keeps an incremental PID cache so the process count only looks up new
+processes. Collectors read the latest delta without waiting, except
+right after start, when the first delta is held back until it covers
+at least MIN_WINDOW.
+
+psutil is optional; without it the sampler reports nothing.
+"""
+
+import threading
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Seconds between samples
+SAMPLE_INTERVAL = 2
+
+# How many deltas the ring keeps
+RING_SIZE = 30
+
+# Shortest span (seconds) a rate may cover; shorter ones are mostly noise
+MIN_WINDOW = 0.25
+
+def cpu_busy(times):
+    """(busy, total) seconds of one psutil cpu_times entry"""
+    # On Linux guest and guest_nice are already counted in user and nice
+    total = sum(times) - getattr(times, 'guest', 0) - getattr(times, 'guest_nice', 0)
+    idle = times.idle + getattr(times, 'iowait', 0)
+    return total - idle, total
+
+def rate(new, old, seconds):
+    """Per-second rate of a monotonically increasing counter"""
+    # Counters reset when an interface or disk goes away; don't report
+    # a negative rate for that interval
+    return max(0, new - old) / seconds if seconds > 0 else 0
+
+class MachineSampler:
+    """Samples CPU, load, network, disk and processes on a background thread"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, ring_size=RING_SIZE):
+        self.interval = interval
+        self.ring = deque(maxlen=ring_size)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.previous = None
+        # pid -> process name, so only new PIDs have to be looked up
+        self.processes = {}
+        self.python_count = 0
+
+    def start(self):
+        """Take a first reading and start sampling in the background"""
+        self.sample()
+        self.thread = threading.Thread(target=self.run, name='machine-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1)
+
+    def run(self):
+        # Sample on a fixed cadence rather than sleeping interval after
+        # each (variable-length) sample
+        next_sample = time.monotonic() + self.interval
+        while not self.stop_event.wait(max(0, next_sample - time.monotonic())):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[WARN] Machine sampler failed: {e}")
+            next_sample += self.interval
+            if next_sample < time.monotonic():
+                # Fell behind (e.g. the machine was suspended); skip ahead
+                next_sample = time.monotonic() + self.interval
+
+    def read_counters(self):
+        """One raw reading of every counter; none of these calls block"""
+        try:
+            disk = psutil.disk_io_counters()
+        except Exception:
+            # Not available in some containers and VMs
+            disk = None
+        return {
+            'time': time.monotonic(),
+            'cpu': psutil.cpu_times(percpu=True),
+            'net': psutil.net_io_counters(),
+            'disk': disk,
+        }
+
+    def update_processes(self):
+        """Refresh the PID cache and the running count of Python processes"""
+        pids = set(psutil.pids())
+        for pid in self.processes.keys() - pids:
+            if 'python' in self.processes.pop(pid):
+                self.python_count -= 1
+        for pid in pids - self.processes.keys():
+            try:
+                name = psutil.Process(pid).name().lower()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                name = ''
+            self.processes[pid] = name
+            if 'python' in name:
+                self.python_count += 1
+
+    def sample(self):
+        """Read the counters and append the delta since the previous reading"""
+        if psutil is None:
+            return
+        with self.lock:
+            current = self.read_counters()
+            self.update_processes()
+            previous, self.previous = self.previous, current
+            if previous is None:
+                return
+
+            seconds = current['time'] - previous['time']
+            per_core = []
+            busy_sum = total_sum = 0
+            for new, old in zip(current['cpu'], previous['cpu']):
+                new_busy, new_total = cpu_busy(new)
+                old_busy, old_total = cpu_busy(old)
+                busy = max(0, new_busy - old_busy)
+                total = new_total - old_total
+                per_core.append(round(100 * busy / total, 1) if total > 0 else 0.0)
+                busy_sum += busy
+                total_sum += total
+
+            delta = {
+                'seconds': seconds,
+                'cpuPercent': round(100 * busy_sum / total_sum, 1) if total_sum > 0 else 0.0,
+                'cpuPerCore': per_core,
+                'netRxBytesPerSec': rate(current['net'].bytes_recv, previous['net'].bytes_recv, seconds),
+                'netTxBytesPerSec': rate(current['net'].bytes_sent, previous['net'].bytes_sent, seconds),
+                'diskReadBytesPerSec': 0,
+                'diskWriteBytesPerSec': 0,
+            }
+            if current['disk'] is not None and previous['disk'] is not None:
+                delta['diskReadBytesPerSec'] = rate(current['disk'].read_bytes, previous['disk'].read_bytes, seconds)
+                delta['diskWriteBytesPerSec'] = rate(current['disk'].write_bytes, previous['disk'].write_bytes, seconds)
+            self.ring.append(delta)
+
+    def latest(self):
+        """Most recent delta plus load averages and process counts.
+
+        Right after start() there is only one reading; in that case a
+        second one is taken once at least MIN_WINDOW has passed since the
+        first (waiting out the remainder), so a one-shot run gets rates
+        over a meaningful span rather than a few milliseconds.
+        """
+        if psutil is None:
+            return {}
+        if not self.ring:
+            with self.lock:
+                first = self.previous['time'] if self.previous else None
+            if first is not None:
+                time.sleep(max(0, first + MIN_WINDOW - time.monotonic()))
+            if not self.ring:
+                self.sample()
+        with self.lock:
+            latest = dict(self.ring[-1]) if self.ring else {}
+            latest['processes'] = len(self.processes)
+            latest['pythonProcesses'] = self.python_count
+        try:
+            latest['loadAvg'] = [round(load, 2) for load in psutil.getloadavg()]
+        except (AttributeError, OSError):
+            latest['loadAvg'] = []
+        return latest
+
+    def deltas(self):
+        """Copy of the ring, oldest first"""
+        with self.lock:
+            return [dict(delta) for delta in self.ring]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Prometheus text-format metrics for the dashboard
+
+CollectorMetrics keeps each section's collector duration histogram,
+failure count and last success time in lists allocated up front, so
+recording a run is a few index operations. generate_data.py publishes
+its counters in data.json's _meta; api.py keeps its own for the sections
+it refreshes, and MetricsPage turns both, plus the machine, token
+and Clip Empire gauges of the current snapshot, into a /metrics page.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the collector duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# data.json's top-level keys are published by the API as 'dashboard.<key>'
+DASHBOARD_PREFIX = 'dashboard.'
+
+# The keys snapshot_families() reads; the gauges are re-rendered when one changes
+GAUGE_SECTIONS = ('_meta', 'generatedAt', 'machine', 'token_usage', 'clip_empire')
+
+CAMEL_RE = re.compile(r'(?<=[a-z0-9])([A-Z])')
+
+def snake_case(name):
+    """'cpuPercent' -> 'cpu_percent'"""
+    return CAMEL_RE.sub(r'_\1', name).lower()
+
+def format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+def is_number(value):
+    return isinstance(value, (int, float)) and value == value
+
+class CollectorMetrics:
+    """Preallocated per-section collector counters"""
+
+    def __init__(self, names, buckets=DURATION_BUCKETS):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.buckets = tuple(buckets)
+        # Per section: one count per bucket plus +Inf (not cumulative)
+        self.bucket_counts = [[0] * (len(self.buckets) + 1) for _ in self.names]
+        self.sums = [0.0] * len(self.names)
+        self.counts = [0] * len(self.names)
+        self.failures = [0] * len(self.names)
+        self.last_success = [None] * len(self.names)
+        # Bumped on every change, so rendered text can be reused until then
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds, ok=True):
+        """Record one collector run"""
+        i = self.index[name]
+        bucket = bisect_left(self.buckets, seconds)
+        with self.lock:
+            self.bucket_counts[i][bucket] += 1
+            self.sums[i] += seconds
+            self.counts[i] += 1
+            if ok:
+                self.last_success[i] = time.time()
+            else:
+                self.failures[i] += 1
+            self.generation += 1
+
+    def fail(self, name):
+        """Record a failure with no duration (e.g. a missed deadline)"""
+        with self.lock:
+            self.failures[self.index[name]] += 1
+            self.generation += 1
+
+    def wrap(self, name, fn):
+        """fn, timed and recorded under name on every call"""
+        def timed():
+            started = time.perf_counter()
+            try:
+                value = fn()
+            except BaseException:
+                self.observe(name, time.perf_counter() - started, ok=False)
+                raise
+            self.observe(name, time.perf_counter() - started)
+            return value
+        return timed
+
+    def restore(self, exported):
+        """Continue from counters saved by export(), e.g. by a previous run.
+
+        Sections or buckets that don't match are left at zero.
+        """
+        if not exported or list(exported.get('buckets') or []) != list(self.buckets):
+            return
+        with self.lock:
+            for name, counters in (exported.get('sections') or {}).items():
+                i = self.index.get(name)
+                if i is None or len(counters.get('counts') or []) != len(self.buckets) + 1:
+                    continue
+                self.bucket_counts[i] = list(counters['counts'])
+                self.sums[i] = counters.get('sumSeconds', 0.0)
+                self.counts[i] = counters.get('count', 0)
+                self.failures[i] = counters.get('failures', 0)
+                self.last_success[i] = counters.get('lastSuccessAt')
+            self.generation += 1
+
+    def export(self):
+        """JSON-serializable copy of every counter"""
+        with self.lock:
+            return {
+                'buckets': list(self.buckets),
+                'sections': {
+                    name: {
+                        'counts': list(self.bucket_counts[i]),
+                        'sumSeconds': round(self.sums[i], 6),
+                        'count': self.counts[i],
+                        'failures': self.failures[i],
+                        'lastSuccessAt': self.last_success[i],
+                    }
+                    for i, name in enumerate(self.names)
+                },
+            }
+
+def collector_families(sources):
+    """Collector metric families from {source label: export() dict}"""
+    duration, failures, last_success = [], [], []
+    for source, exported in sources.items():
+        if not exported:
+            continue
+        bounds = exported.get('buckets') or []
+        for section, counters in exported.get('sections', {}).items():
+            labels = {'source': source, 'section': section}
+            cumulative = 0
+            for bound, count in zip([*bounds, '+Inf'], counters['counts']):
+                cumulative += count
+                le = bound if bound == '+Inf' else format_value(bound)
+                duration.append(('_bucket', {**labels, 'le': le}, cumulative))
+            duration.append(('_sum', labels, counters['sumSeconds']))
+            duration.append(('_count', labels, counters['count']))
+            failures.append(('', labels, counters['failures']))
+            if counters.get('lastSuccessAt') is not None:
+                last_success.append(('', labels, counters['lastSuccessAt']))
+    return [
+        ('openclaw_collector_duration_seconds', 'histogram',
+         "Time spent in each section's collector", duration),
+        ('openclaw_collector_failures_total', 'counter',
+         "Collector runs that raised or missed their deadline", failures),
+        ('openclaw_collector_last_success_timestamp_seconds', 'gauge',
+         "Unix time of each section's last successful collection", last_success),
+    ]
+
+def scalar_family(name, help_text, values):
+    """One gauge family per numeric field of a snapshot section"""
+    families = []
+    for key, value in (values or {}).items():
+        if is_number(value) and not isinstance(value, bool):
+            families.append((f'{name}_{snake_case(key)}', 'gauge', f"{help_text} ({key})",
+                             [('', {}, value)]))
+    return families
+
+def snapshot_families(dashboard):
+    """Gauge families from the sections of data.json"""
+    meta = dashboard.get('_meta') or {}
+    families = [
+        ('openclaw_collector_stale', 'gauge',
+         "1 while generate_data.py is serving a section's last good value",
+         [('', {'section': name}, bool(info.get('stale')))
+          for name, info in (meta.get('sections') or {}).items()]),
+    ]
+    if is_number(dashboard.get('generatedAt')):
+        families.append(('openclaw_snapshot_generated_timestamp_seconds', 'gauge',
+                         "Unix time data.json was generated",
+                         [('', {}, dashboard['generatedAt'] / 1000)]))
+    if is_number(meta.get('durationMs')):
+        families.append(('openclaw_snapshot_duration_seconds', 'gauge',
+                         "Time the last data.json refresh took",
+                         [('', {}, meta['durationMs'] / 1000)]))
+    families += scalar_family('openclaw_machine', "Machine health", dashboard.get('machine'))
+    families += scalar_family('openclaw_tokens', "Token usage", dashboard.get('token_usage'))
+
+    clip_empire = dashboard.get('clip_empire') or {}
+    families += scalar_family('openclaw_clip_empire', "Clip Empire totals", clip_empire)
+    channels = [c for c in clip_empire.get('channels') or [] if isinstance(c, dict)]
+    for field in ('queued', 'today_count', 'daily_target'):
+        families.append((f'openclaw_clip_empire_channel_{field}', 'gauge',
+                         f"Clip Empire {field.replace('_', ' ')} per channel",
+                         [('', {'channel': c.get('name')}, c[field])
+                          for c in channels if is_number(c.get(field))]))
+    return families
+
+def single_flight_family(stats):
+    """Counter family from SingleFlight.stats()"""
+    return ('openclaw_api_single_flight_calls_total', 'counter',
+            "API calls by how they were answered: computed, coalesced or cached",
+            [('', {'resource': resource, 'result': result}, count)
+             for resource, counts in stats.items() for result, count in counts.items()])
+
+def render_families(families):
+    """Prometheus text exposition of [(name, type, help, [(suffix, labels, value)])]"""
+    lines = []
+    for name, kind, help_text, samples in families:
+        if not samples:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            lines.append(f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+    return '\n'.join(lines) + '\n' if lines else ''
+
+class MetricsPage:
+    """/metrics text, re-rendered only where something changed.
+
+    The collector part is reused until this process's counters or the
+    snapshot change, and the gauge part until the snapshot changes, so a
+    scrape between changes only renders the extra families.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cached_key = None
+        self.cached_text = ''
+
+    def render(self, live, dashboard, key, extra=()):
+        """Page for this process's CollectorMetrics, the dashboard sections
+        (name -> payload) identified by key, and extra ready-made families"""
+        with self.lock:
+            full_key = (live.generation, key)
+            if full_key != self.cached_key:
+                meta = dashboard.get('_meta') or {}
+                self.cached_text = render_families(
+                    collector_families({'api': live.export(), 'generator': meta.get('collectors')})
+                    + snapshot_families(dashboard))
+                self.cached_key = full_key
+            text = self.cached_text
+        return (text + render_families(list(extra))).encode('utf-8')
+
+    def render_snapshot(self, snapshot, live, extra=()):
+        """Page for an API snapshot whose data.json keys are 'dashboard.*' sections"""
+        key = tuple(snapshot.versions.get(DASHBOARD_PREFIX + name) for name in GAUGE_SECTIONS)
+        dashboard = {name[len(DASHBOARD_PREFIX):]: payload
+                     for name, payload in snapshot.sections.items()
+                     if name.startswith(DASHBOARD_PREFIX)}
+        return self.render(live, dashboard, key, extra)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Add the publish_jobs indexes the dashboard's Clip Empire query needs
+
+generate_data.py opens clip_empire.db read-only, so it can't create these
+itself. Safe to run any number of times.
+
+Usage: python migrate_clip_empire.py [path/to/clip_empire.db]
+"""
+
+import os
+import sqlite3
+import sys
+
+from workspace_paths import clip_empire_db_path
+
+MIGRATIONS = [
+    # Latest succeeded job per channel: one index seek for MAX(created_at)
+    """CREATE INDEX IF NOT EXISTS idx_publish_jobs_channel_status_created
+       ON publish_jobs(channel_name, status, created_at)""",
+    # Today's and queued counts: range scans on (status, created_at) that
+    # never touch the table
+    """CREATE INDEX IF NOT EXISTS idx_publish_jobs_status_created_channel
+       ON publish_jobs(status, created_at, channel_name)""",
+]
+
+def migrate(db):
+    """Create any missing indexes and refresh the planner statistics"""
+    conn = sqlite3.connect(db)
+    try:
+        for sql in MIGRATIONS:
+            conn.execute(sql)
+        conn.execute("ANALYZE publish_jobs")
+        conn.commit()
+    finally:
+        conn.close()
+
+def main():
+    db = sys.argv[1] if len(sys.argv) > 1 else clip_empire_db_path()
+    if not os.path.exists(db):
+        print(f"[ERROR] {db} not found")
+        sys.exit(1)
+
+    migrate(db)
+    print(f"[OK] {len(MIGRATIONS)} publish_jobs indexes in place on {db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Mid prices for marking open positions to market
+
+A PriceFeed wraps one pluggable source and caches what it returns for a
+short TTL, so every snapshot in a burst shares one request. Sources:
+
+- HttpPriceSource: Hyperliquid's info endpoint (or anything that speaks
+  the same {"type": "allMids"} request, e.g. a local mock server). One
+  batched request returns every coin's mid, over a pooled keep-alive
+  session when requests is installed.
+- FilePriceSource: a JSON file of {coin: price}, for offline use.
+- StaticPriceSource: fixed prices, for tests and demos.
+"""
+
+import json
+import threading
+import time
+from urllib.request import Request, urlopen
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+HYPERLIQUID_INFO_URL = "https://api.hyperliquid.xyz/info"
+
+# Seconds a fetched set of prices is served from cache
+PRICE_TTL = 5
+
+# Seconds to wait for the price source
+PRICE_TIMEOUT = 5
+
+def parse_mids(payload):
+    """{coin: float} from an allMids-style {coin: "123.4"} mapping"""
+    mids = {}
+    for coin, price in payload.items():
+        try:
+            mids[coin] = float(price)
+        except (TypeError, ValueError):
+            continue
+    return mids
+
+class HttpPriceSource:
+    """All mids from one POST to an allMids-compatible endpoint"""
+
+    def __init__(self, url=HYPERLIQUID_INFO_URL, timeout=PRICE_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.session = None
+        if requests is not None:
+            self.session = requests.Session()
+            self.session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    def fetch(self):
+        body = {'type': 'allMids'}
+        if self.session is not None:
+            response = self.session.post(self.url, json=body, timeout=self.timeout)
+            response.raise_for_status()
+            return parse_mids(response.json())
+        request = Request(self.url, data=json.dumps(body).encode('utf-8'),
+                          headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=self.timeout) as response:
+            return parse_mids(json.load(response))
+
+class FilePriceSource:
+    """Prices from a JSON file of {coin: price}"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path, 'r') as f:
+            return parse_mids(json.load(f))
+
+class StaticPriceSource:
+    """Fixed prices"""
+
+    def __init__(self, prices):
+        self.prices = dict(prices)
+
+    def fetch(self):
+        return dict(self.prices)
+
+def make_source(spec):
+    """Price source for a URL, a JSON file path, or a {coin: price} dict"""
+    if isinstance(spec, dict):
+        return StaticPriceSource(spec)
+    if spec.startswith(('http://', 'https://')):
+        return HttpPriceSource(spec)
+    return FilePriceSource(spec)
+
+class PriceFeed:
+    """TTL cache in front of a price source"""
+
+    def __init__(self, source, ttl=PRICE_TTL):
+        self.source = source
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.prices = {}
+        self.fetched_at = None
+
+    def get(self):
+        """{coin: mid}; fetches only when the cached prices are older than the TTL.
+
+        If a fetch fails the previous prices are kept and the error is
+        raised, so the caller can report the section as stale.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.fetched_at is None or now - self.fetched_at >= self.ttl:
+                self.prices = self.source.fetch()
+                self.fetched_at = now
+            return self.prices
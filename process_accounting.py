@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Attributes running processes to the dashboard's cron bots
+
+Each process is classified once, from its command line and working
+directory, and the result is kept in a PID cache; later refreshes only
+read CPU time, RSS and I/O counters for processes that belong to a bot.
+CPU% and I/O rates are computed against the previous refresh, so a
+process's first refresh only contributes its RSS; a bot none of whose
+processes has been seen before (e.g. in every one-shot run) reports
+cpuPercent and the I/O rates as None. Processes whose command line can't
+be read are cached as unreadable until their PID is reused.
+
+psutil is optional; without it bots get no process fields.
+"""
+
+import re
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Extra command-line / cwd substrings that identify a bot's processes, for
+# bots whose name doesn't appear in how they are launched
+BOT_PROCESS_PATTERNS = {
+    'Clip Empire': ['clip_empire'],
+    'Clip Engine': ['clip_engine'],
+}
+
+def bot_patterns(bot):
+    """Lower-case substrings that mark a process as belonging to bot"""
+    words = re.findall(r'[a-z0-9]+', bot['name'].lower())
+    patterns = set(BOT_PROCESS_PATTERNS.get(bot['name'], []))
+    # A single word ('rsi', 'smc') is too likely to match by accident
+    if len(words) > 1:
+        patterns.update(sep.join(words) for sep in ('_', '-', ''))
+    # Short ids would match unrelated command lines
+    if len(bot.get('id') or '') >= 8:
+        patterns.add(bot['id'].lower())
+    return [p.lower() for p in patterns]
+
+class ProcessAccountant:
+    """CPU%, RSS and I/O rates of the processes behind each bot"""
+
+    def __init__(self):
+        # pid -> {'proc', 'haystack', 'bot', 'cpu', 'read', 'write', 'at'};
+        # haystack is None for a process whose command line is unreadable
+        self.cache = {}
+        self.patterns = None
+
+    def classify(self, entry, patterns):
+        """Name of the first bot whose patterns occur in entry's haystack"""
+        if entry['haystack'] is None:
+            return None
+        for name, needles in patterns.items():
+            if any(needle in entry['haystack'] for needle in needles):
+                return name
+        return None
+
+    def inspect(self, pid):
+        """New cache entry for pid, or None if it has gone away"""
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                try:
+                    cmdline = ' '.join(proc.cmdline())
+                except psutil.AccessDenied:
+                    # Cached as unreadable (Process keeps its create time,
+                    # so refresh() notices when the PID is reused)
+                    return {'proc': proc, 'haystack': None, 'bot': None, 'cpu': None,
+                            'read': None, 'write': None, 'at': None}
+                try:
+                    cwd = proc.cwd()
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    cwd = ''
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        haystack = f"{cmdline} {cwd}".lower().replace('\\', '/')
+        return {'proc': proc, 'haystack': haystack, 'bot': None, 'cpu': None,
+                'read': None, 'write': None, 'at': None}
+
+    def refresh(self, bots):
+        """Per-bot totals: name -> {'processes', 'cpuPercent', 'rssMB', ...}"""
+        patterns = {bot['name']: bot_patterns(bot) for bot in bots}
+        pids = set(psutil.pids())
+
+        # PIDs that have exited leave the cache; new ones are read and
+        # classified once. (PID reuse within one refresh is not detected;
+        # pid_max makes it rare enough not to pay a /proc read per PID.)
+        for pid in self.cache.keys() - pids:
+            del self.cache[pid]
+        # Unreadable entries are re-inspected only if their PID now
+        # belongs to a different process (is_running compares create times)
+        for pid, entry in list(self.cache.items()):
+            if entry['haystack'] is None and not entry['proc'].is_running():
+                del self.cache[pid]
+        for pid in pids - self.cache.keys():
+            entry = self.inspect(pid)
+            if entry is not None:
+                entry['bot'] = self.classify(entry, patterns)
+                self.cache[pid] = entry
+
+        # A different bot list means the cached classifications are stale,
+        # but the cached command lines are still good
+        if patterns != self.patterns:
+            for entry in self.cache.values():
+                entry['bot'] = self.classify(entry, patterns)
+            self.patterns = patterns
+
+        totals = {name: {'processes': 0, 'cpuPercent': 0.0, 'rssMB': 0.0,
+                         'ioReadBytesPerSec': 0.0, 'ioWriteBytesPerSec': 0.0}
+                  for name in patterns}
+        # Bots with a process that has a previous sample to compare against
+        sampled = set()
+        now = time.monotonic()
+        for pid, entry in list(self.cache.items()):
+            if entry['bot'] is None:
+                continue
+            proc = entry['proc']
+            try:
+                with proc.oneshot():
+                    if proc.status() == psutil.STATUS_ZOMBIE:
+                        continue
+                    times = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    try:
+                        io = proc.io_counters()
+                    except (psutil.AccessDenied, AttributeError):
+                        # Other users' processes, and macOS
+                        io = None
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del self.cache[pid]
+                continue
+            except psutil.AccessDenied:
+                continue
+
+            cpu = times.user + times.system
+            total = totals[entry['bot']]
+            total['processes'] += 1
+            total['rssMB'] += rss / (1024 * 1024)
+            # A first sighting has nothing to take a rate against
+            if entry['at'] is not None:
+                sampled.add(entry['bot'])
+                elapsed = max(now - entry['at'], 1e-3)
+                total['cpuPercent'] += 100 * max(0, cpu - entry['cpu']) / elapsed
+                if io is not None and entry['read'] is not None:
+                    total['ioReadBytesPerSec'] += max(0, io.read_bytes - entry['read']) / elapsed
+                    total['ioWriteBytesPerSec'] += max(0, io.write_bytes - entry['write']) / elapsed
+            entry['cpu'] = cpu
+            entry['at'] = now
+            if io is not None:
+                entry['read'] = io.read_bytes
+                entry['write'] = io.write_bytes
+
+        for name, total in totals.items():
+            total['rssMB'] = round(total['rssMB'], 1)
+            if name in sampled:
+                total['cpuPercent'] = round(total['cpuPercent'], 1)
+                total['ioReadBytesPerSec'] = round(total['ioReadBytesPerSec'])
+                total['ioWriteBytesPerSec'] = round(total['ioWriteBytesPerSec'])
+            elif total['processes']:
+                total['cpuPercent'] = None
+                total['ioReadBytesPerSec'] = None
+                total['ioWriteBytesPerSec'] = None
+        return totals
+
+_accountant = None
+
+def attribute_processes(bots):
+    """Add processes, cpuPercent, rssMB and I/O rates to every bot in place"""
+    global _accountant
+    if psutil is None:
+        return bots
+    if _accountant is None:
+        _accountant = ProcessAccountant()
+    try:
+        totals = _accountant.refresh(bots)
+    except Exception as e:
+        print(f"[WARN] Could not attribute processes to bots: {e}")
+        return bots
+    for bot in bots:
+        bot.update(totals.get(bot['name'], {}))
+    return bots
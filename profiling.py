@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Profiling for one generate_data.py run (--profile)
+
+cProfile only sees the thread it is enabled on, and the collectors run on
+a thread pool, so each collector call gets its own cProfile.Profile on
+its own thread (wrap()) and the results are merged into one .pstats
+file. Alongside, a sampler thread records every thread's stack at a fixed
+interval and writes them as collapsed stacks ("thread;outer;...;inner
+count" per line), the input format of flamegraph.pl and speedscope.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Profiler:
+    """cProfile across threads plus a sampled collapsed-stack profile"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.main = cProfile.Profile()
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, name='profile-sampler', daemon=True)
+
+    def wrap(self, fn):
+        """fn, profiled on whichever thread calls it"""
+        def profiled():
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return fn()
+            finally:
+                profile.disable()
+                with self.lock:
+                    self.profiles.append(profile)
+        return profiled
+
+    def start(self):
+        self.sampler.start()
+        self.main.enable()
+
+    def stop(self):
+        self.main.disable()
+        self.stop_event.set()
+        self.sampler.join()
+
+    def sample(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, prefix):
+        """Write prefix.pstats and prefix.collapsed; returns the merged Stats"""
+        stats = pstats.Stats(self.main)
+        with self.lock:
+            for profile in self.profiles:
+                stats.add(profile)
+        stats.dump_stats(prefix + '.pstats')
+        with open(prefix + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return stats
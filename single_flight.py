@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing
+
+Concurrent calls for the same key share one computation: the first caller
+runs it, the others wait for its result (or its exception). The result is
+then served from memory for a short TTL, so a burst of dashboards
+refreshing at the same moment costs one computation instead of one each.
+AsyncSingleFlight does the same for coroutines on one event loop, so
+waiters await the leader's task instead of blocking a thread.
+"""
+
+import asyncio
+import threading
+import time
+
+# Seconds a computed result keeps being served
+RESULT_TTL = 2
+
+# Expired results are swept once more than this many are held
+MAX_RESULTS = 256
+
+class _Call:
+    """One in-flight computation"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls per key and caches results for ttl seconds.
+
+    Keys are tuples whose first element names the resource; counters are
+    kept per resource: computed (calls that ran fn), coalesced (calls that
+    waited on another caller's computation) and cached (calls answered
+    from a result younger than the TTL).
+    """
+
+    def __init__(self, ttl=RESULT_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> _Call still running
+        self.calls = {}
+        # key -> (expires at, value)
+        self.results = {}
+        self.counters = {}
+
+    def count(self, key, counter):
+        counts = self.counters.setdefault(key[0], {'computed': 0, 'coalesced': 0, 'cached': 0})
+        counts[counter] += 1
+
+    def do(self, key, fn):
+        """fn()'s result, computed at most once for concurrent or recent callers"""
+        with self.lock:
+            now = time.monotonic()
+            cached = self.results.get(key)
+            if cached is not None and cached[0] > now:
+                self.count(key, 'cached')
+                return cached[1]
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            self.count(key, 'computed' if leader else 'coalesced')
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            # Failures are shared with the waiters but never cached
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                if call.error is None:
+                    self.store(key, call.value)
+            call.done.set()
+        return call.value
+
+    def store(self, key, value):
+        now = time.monotonic()
+        if len(self.results) >= MAX_RESULTS:
+            self.results = {k: v for k, v in self.results.items() if v[0] > now}
+        self.results[key] = (now + self.ttl, value)
+
+    def stats(self):
+        """{resource: {computed, coalesced, cached}}"""
+        with self.lock:
+            return {name: dict(counts) for name, counts in self.counters.items()}
+
+class AsyncSingleFlight(SingleFlight):
+    """SingleFlight for coroutine functions, with the same TTL and counters"""
+
+    async def do(self, key, fn):
+        """await fn()'s result, computed at most once for concurrent or recent callers"""
+        with self.lock:
+            now = time.monotonic()
+            cached = self.results.get(key)
+            if cached is not None and cached[0] > now:
+                self.count(key, 'cached')
+                return cached[1]
+            task = self.calls.get(key)
+            leader = task is None
+            if leader:
+                task = self.calls[key] = asyncio.ensure_future(self.run(key, fn))
+            self.count(key, 'computed' if leader else 'coalesced')
+        # A caller that goes away (e.g. a client disconnect) must not
+        # cancel the computation the others are waiting on
+        return await asyncio.shield(task)
+
+    async def run(self, key, fn):
+        try:
+            value = await fn()
+        finally:
+            with self.lock:
+                del self.calls[key]
+        with self.lock:
+            # Failures are shared with the waiters but never cached
+            self.store(key, value)
+        return value
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Sequence-numbered deltas between consecutive dashboard snapshots
+
+Every snapshot gets a monotonically increasing "seq". Next to data.json the
+generator keeps deltas.json: the latest seq plus a short ring of RFC 6902
+JSON Patch documents, each turning snapshot seq-1 into snapshot seq. A
+dashboard that already holds snapshot N fetches the ring, applies the
+patches after N and only re-downloads data.json when it has fallen out of
+the ring.
+"""
+
+import json
+
+# How many deltas deltas.json keeps
+DELTA_RING = 60
+
+def escape_pointer(key):
+    """Escape one JSON Pointer reference token (RFC 6901)"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def diff(old, new, path=''):
+    """RFC 6902 JSON Patch operations that turn old into new.
+
+    Containers are always walked rather than compared with ==, which
+    would treat 1, 1.0 and True as the same value.
+    """
+    if type(old) != type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+
+    if isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_pointer(key)}"
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+
+    if isinstance(new, list):
+        common = min(len(old), len(new))
+        ops = []
+        for i in range(common):
+            ops.extend(diff(old[i], new[i], f"{path}/{i}"))
+        for i in range(common, len(new)):
+            ops.append({'op': 'add', 'path': f"{path}/{i}", 'value': new[i]})
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{i}"})
+        # An insert near the front shifts everything; send the list instead
+        if len(ops) > len(new):
+            return [{'op': 'replace', 'path': path, 'value': new}]
+        return ops
+
+    if old != new:
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return []
+
+class DeltaLog:
+    """Assigns sequence numbers and keeps the ring of recent deltas.
+
+    The previous snapshot and ring live in memory for the daemon and are
+    read back from data.json / deltas.json by one-shot cron runs.
+    """
+
+    def __init__(self, snapshot_file, delta_file, size=DELTA_RING):
+        self.snapshot_file = snapshot_file
+        self.delta_file = delta_file
+        self.size = size
+        self.previous = None
+        self.deltas = None
+
+    def load(self):
+        """Read the previous snapshot and ring written by an earlier run"""
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                self.previous = json.load(f)
+        except:
+            self.previous = None
+        try:
+            with open(self.delta_file, 'r') as f:
+                self.deltas = json.load(f).get('deltas', [])
+        except:
+            self.deltas = []
+
+    def next(self, data):
+        """Stamp data with the next seq and record its delta.
+
+        Returns the deltas.json document to publish alongside data.
+        """
+        if self.deltas is None:
+            self.load()
+
+        previous = self.previous
+        seq = previous.get('seq', 0) + 1 if isinstance(previous, dict) else 1
+        data['seq'] = seq
+
+        if previous is not None and 'seq' in previous:
+            self.deltas.append({'seq': seq, 'patch': diff(previous, data)})
+            del self.deltas[:-self.size]
+        else:
+            # Nothing to diff against; clients holding older data reload
+            self.deltas = []
+
+        self.previous = data
+        return {'seq': seq, 'deltas': self.deltas}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Output stage for dashboard snapshots
+
+Writes minified JSON (through orjson when it is installed) and publishes
+every file atomically - a temp file in the same directory, then os.replace
+- so a reader never sees half a snapshot. Pre-compressed .gz and .br
+siblings are written next to each file for static hosting to serve
+directly, and a MessagePack or CBOR copy of the snapshot for API clients
+that ask for a binary format.
+
+orjson, brotli, msgpack and cbor2 are all optional; whatever is missing is
+simply skipped.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+def encode_json(data):
+    """Minified UTF-8 JSON bytes"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # e.g. non-string dict keys, which the stdlib encoder coerces
+            pass
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def binary_format():
+    """(file extension, encoder) of the available binary format, or None"""
+    if msgpack is not None:
+        return 'msgpack', lambda data: msgpack.packb(data, use_bin_type=True)
+    if cbor2 is not None:
+        return 'cbor', cbor2.dumps
+    return None
+
+def gzip_bytes(body):
+    """gzip with a fixed mtime so identical bodies give identical files"""
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def brotli_bytes(body):
+    """Brotli-compressed body, or None if brotli isn't installed"""
+    if brotli is None:
+        return None
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+def write_atomic(path, body):
+    """Replace path with body without ever exposing a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        # mkstemp creates 0600; the web server has to be able to read it
+        os.chmod(tmp_path, 0o644)
+        # Windows refuses to replace a file another process has open;
+        # dashboards only hold it for a moment, so retry briefly
+        for attempt in range(5):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                if attempt == 4:
+                    raise
+                time.sleep(0.05)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def publish(path, body):
+    """Publish body at path together with its .gz and .br siblings"""
+    # Siblings first, so the plain file is never newer than its
+    # compressed copies
+    write_atomic(path + '.gz', gzip_bytes(body))
+    compressed = brotli_bytes(body)
+    if compressed is not None:
+        write_atomic(path + '.br', compressed)
+    elif os.path.exists(path + '.br'):
+        # Don't leave a stale copy behind if brotli went away
+        os.remove(path + '.br')
+    write_atomic(path, body)
+
+def publish_json(path, data):
+    """Publish data as minified JSON with compressed siblings"""
+    publish(path, encode_json(data))
+
+def publish_snapshot(path, data):
+    """Publish the snapshot as JSON, plus a binary copy when an encoder is installed"""
+    publish_json(path, data)
+    binary = binary_format()
+    if binary is not None:
+        extension, encode = binary
+        write_atomic(os.path.splitext(path)[0] + '.' + extension, encode(data))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Tests for generate_data.py's collector runner"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run_script(code, timeout=30):
+    """Run code in a fresh interpreter next to generate_data.py; returns (seconds, stdout)"""
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True,
+                            text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return time.monotonic() - started, result.stdout
+
+class CollectAllTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.dir.name, 'collector_state.json')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_process_exits_at_the_deadline_not_when_a_slow_collector_finishes(self):
+        seconds, stdout = run_script(f"""
+import time
+import generate_data as g
+g.STATE_FILE = {self.state_file!r}
+collectors = {{'slow': (lambda: time.sleep(6) or 'late', 1, 'fallback')}}
+results, sections = g.collect_all(collectors, last_good={{}})
+print(results['slow'], sections['slow']['stale'])
+""")
+        self.assertEqual(stdout.splitlines()[-1], 'fallback True')
+        self.assertLess(seconds, 4)
+
+    def one_shot(self, outcome):
+        """One collect_all() run in a fresh interpreter of a 'bots' collector
+        that returns outcome, or raises if outcome is None"""
+        _, stdout = run_script(f"""
+import json
+import generate_data as g
+g.STATE_FILE = {self.state_file!r}
+def bots():
+    if {outcome!r} is None:
+        raise RuntimeError("openclaw not found")
+    return {outcome!r}
+results, sections = g.collect_all({{'bots': (bots, 5, [])}})
+print(json.dumps([results['bots'], sections['bots']['stale']]))
+""")
+        with open(self.state_file) as f:
+            state = json.load(f)
+        return json.loads(stdout.splitlines()[-1]), state
+
+    def test_failing_collector_keeps_last_good_and_is_marked_stale(self):
+        (value, stale), _ = self.one_shot(['RSI Bot'])
+        self.assertEqual((value, stale), (['RSI Bot'], False))
+
+        (value, stale), state = self.one_shot(None)
+        self.assertEqual((value, stale), (['RSI Bot'], True))
+        self.assertEqual(state['bots']['value'], ['RSI Bot'])
+
+    def test_failures_count_up_across_one_shot_runs(self):
+        self.one_shot(['RSI Bot'])
+        for expected in (1, 2):
+            _, state = self.one_shot(None)
+            counters = state['_collectorMetrics']['sections']['bots']
+            self.assertEqual(counters['failures'], expected)
+            self.assertEqual(counters['count'], expected + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Tests for token_ledger.py"""
+
+import os
+import tempfile
+import unittest
+
+from token_ledger import TokenLedger
+
+NOW = 1760000000
+
+def session(key, tokens):
+    return {'sessionKey': key, 'tokens': tokens, 'model': 'claude-sonnet-4-5', 'channel': 'discord'}
+
+class TokenLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ledger = TokenLedger(os.path.join(self.dir.name, 'ledger.db'), quota=100000)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.dir.cleanup()
+
+    def test_first_run_sets_baselines_without_usage(self):
+        # Long-lived sessions already exist when the ledger is deployed
+        recorded = self.ledger.record([session('a', 80000), session('b', 50000)], now=NOW)
+        self.assertEqual(recorded, 0)
+        summary = self.ledger.summary(now=NOW)
+        self.assertEqual(summary['last24h'], 0)
+        self.assertEqual(summary['monthToDate'], 0)
+        self.assertEqual(summary['burnPerHour'], 0)
+        self.assertIsNone(summary['exhaustsAt'])
+
+    def test_records_growth_after_first_sighting(self):
+        self.ledger.record([session('a', 80000)], now=NOW)
+        self.assertEqual(self.ledger.record([session('a', 81500)], now=NOW + 60), 1500)
+        self.assertEqual(self.ledger.summary(now=NOW + 60)['last24h'], 1500)
+
+    def test_session_found_later_only_sets_a_baseline(self):
+        self.ledger.record([session('a', 1000)], now=NOW)
+        self.assertEqual(self.ledger.record([session('a', 1200), session('b', 90000)], now=NOW + 60), 200)
+
+    def test_restarted_session_counts_its_whole_total(self):
+        self.ledger.record([session('a', 5000)], now=NOW)
+        self.assertEqual(self.ledger.record([session('a', 300)], now=NOW + 60), 300)
+
+if __name__ == '__main__':
+    unittest.main()
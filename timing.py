@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Timing spans for generate_data.py's collectors
+
+timed() wraps a collector so every span() entered while it runs (on its
+thread) is recorded against its section: subprocess spawns, SQLite
+queries, folder walks, price fetches. The latest run of each section is
+kept and published in the snapshot's _meta.timings, e.g.
+
+    "bots": {"durationMs": 1840.2, "spans": [
+        {"name": "openclaw cron list", "kind": "subprocess",
+         "startMs": 0.1, "durationMs": 1838.9}]}
+
+With tracing on (--trace) every span's wall time is also printed as it
+finishes.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+_lock = threading.Lock()
+# section -> {'durationMs', 'spans'} of its latest run
+_timings = {}
+_trace = False
+
+def enable_trace():
+    """Print the wall time of every span and collector run"""
+    global _trace
+    _trace = True
+
+@contextmanager
+def span(name, kind='step'):
+    """Time a block; recorded against the collector running on this thread"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        run = getattr(_local, 'run', None)
+        if run is not None:
+            run['spans'].append({
+                'name': name,
+                'kind': kind,
+                'startMs': round((started - run['started']) * 1000, 2),
+                'durationMs': round(elapsed, 2),
+            })
+        if _trace:
+            section = run['section'] if run is not None else '-'
+            # One write per line, so lines from collector threads don't interleave
+            print(f"[TRACE] {section}: {kind} {name} {elapsed:.1f} ms\n", end='')
+
+def timed(section, fn):
+    """fn, recording the spans of each call as section's latest run"""
+    def run():
+        started = time.perf_counter()
+        record = _local.run = {'section': section, 'started': started, 'spans': []}
+        try:
+            return fn()
+        finally:
+            _local.run = None
+            elapsed = (time.perf_counter() - started) * 1000
+            with _lock:
+                _timings[section] = {'durationMs': round(elapsed, 2), 'spans': record['spans']}
+            if _trace:
+                print(f"[TRACE] {section}: collector {elapsed:.1f} ms\n", end='')
+    return run
+
+def export():
+    """Copy of the latest run of every section"""
+    with _lock:
+        return {name: {'durationMs': t['durationMs'], 'spans': list(t['spans'])}
+                for name, t in _timings.items()}
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Persistent ledger of token usage across OpenClaw sessions
+
+`openclaw sessions list` only reports the running total of sessions that
+still exist, so summing it loses everything from expired sessions and
+says nothing about rate. The ledger remembers the last total it saw for
+every session and records only the difference on each tick, attributed to
+the session's model and channel. A session's first sighting only sets its
+baseline: its total so far was spent at some unknown time before the
+ledger saw it, and booking it all at once would swamp the rolling totals.
+Rolling 1h / 24h / month-to-date totals, the heaviest sessions and a
+linear forecast of when the monthly quota runs out are all answered from
+those deltas.
+"""
+
+import heapq
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Monthly token budget the forecast and percentage are measured against
+TOKEN_QUOTA = 200000
+
+# How many sessions the heaviest-sessions list keeps
+TOP_SESSIONS = 5
+
+# Usage rows older than this are deleted (a little over a month, so
+# month-to-date always has its data)
+RETENTION = 35 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_key TEXT PRIMARY KEY,
+    last_total INTEGER NOT NULL,
+    model TEXT,
+    channel TEXT,
+    name TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage (
+    ts REAL NOT NULL,
+    session_key TEXT NOT NULL,
+    model TEXT,
+    channel TEXT,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_ts ON usage(ts);
+"""
+
+def month_start(now):
+    """Epoch seconds of local midnight on the first of now's month"""
+    return datetime.fromtimestamp(now).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+def next_month_start(now):
+    """Epoch seconds of when the monthly quota resets"""
+    start = datetime.fromtimestamp(month_start(now))
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1).timestamp()
+    return start.replace(month=start.month + 1).timestamp()
+
+class TokenLedger:
+    """Records per-session token deltas and summarises them"""
+
+    def __init__(self, path, quota=TOKEN_QUOTA):
+        self.quota = quota
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the underlying connection"""
+        with self.lock:
+            self.conn.close()
+
+    def record(self, sessions, now=None):
+        """Record the token deltas of a fresh sessions list; returns the total delta"""
+        now = time.time() if now is None else now
+        recorded = 0
+        with self.lock, self.conn:
+            last = dict(self.conn.execute("SELECT session_key, last_total FROM sessions"))
+            for session in sessions:
+                key = session.get('sessionKey')
+                total = session.get('tokens') or 0
+                if not key:
+                    continue
+                previous = last.get(key)
+                if previous is None:
+                    # First sighting: only the baseline for later deltas
+                    delta = 0
+                elif total < previous:
+                    # The session restarted: everything it reports is new
+                    delta = total
+                else:
+                    delta = total - previous
+                if delta > 0:
+                    self.conn.execute(
+                        "INSERT INTO usage (ts, session_key, model, channel, tokens) VALUES (?, ?, ?, ?, ?)",
+                        (now, key, session.get('model'), session.get('channel'), delta))
+                    recorded += delta
+                self.conn.execute(
+                    "INSERT INTO sessions (session_key, last_total, model, channel, name, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (session_key) DO UPDATE SET "
+                    "last_total = excluded.last_total, model = excluded.model, "
+                    "channel = excluded.channel, name = excluded.name, seen_at = excluded.seen_at",
+                    (key, total, session.get('model'), session.get('channel'), session.get('name'), now))
+            self.conn.execute("DELETE FROM usage WHERE ts < ?", (now - RETENTION,))
+            self.conn.execute("DELETE FROM sessions WHERE seen_at < ?", (now - RETENTION,))
+        return recorded
+
+    def total_since(self, since):
+        """Tokens recorded since the given epoch time"""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(tokens), 0) FROM usage WHERE ts >= ?", (since,)).fetchone()[0]
+
+    def top_sessions(self, since, k=TOP_SESSIONS):
+        """The k heaviest sessions since the given time, heaviest first"""
+        # Bounded min-heap: memory stays at k however many sessions there are
+        heap = []
+        for key, tokens in self.conn.execute(
+                "SELECT session_key, SUM(tokens) FROM usage WHERE ts >= ? GROUP BY session_key", (since,)):
+            if len(heap) < k:
+                heapq.heappush(heap, (tokens, key))
+            elif tokens > heap[0][0]:
+                heapq.heapreplace(heap, (tokens, key))
+
+        names = {}
+        for tokens, key in heap:
+            row = self.conn.execute(
+                "SELECT name, model, channel FROM sessions WHERE session_key = ?", (key,)).fetchone()
+            names[key] = row or (None, None, None)
+        return [
+            {'sessionKey': key, 'name': names[key][0], 'model': names[key][1],
+             'channel': names[key][2], 'tokens': tokens}
+            for tokens, key in sorted(heap, reverse=True)
+        ]
+
+    def breakdown(self, column, since):
+        """{value of column: tokens} since the given time"""
+        return {
+            value or 'unknown': tokens for value, tokens in self.conn.execute(
+                f"SELECT {column}, SUM(tokens) FROM usage WHERE ts >= ? GROUP BY {column} "
+                f"ORDER BY SUM(tokens) DESC", (since,))
+        }
+
+    def forecast(self, used, burn_per_hour, now):
+        """Epoch seconds when the quota runs out at the current burn rate.
+
+        None when nothing is being burned or the quota resets first.
+        """
+        if burn_per_hour <= 0:
+            return None
+        if used >= self.quota:
+            return now
+        exhausted = now + (self.quota - used) / burn_per_hour * 3600
+        return exhausted if exhausted < next_month_start(now) else None
+
+    def summary(self, now=None):
+        """Rolling totals, breakdowns, heaviest sessions and quota forecast"""
+        now = time.time() if now is None else now
+        mtd_start = month_start(now)
+        with self.lock:
+            last_hour = self.total_since(now - 3600)
+            last_day = self.total_since(now - 86400)
+            mtd = self.total_since(mtd_start)
+            by_model = self.breakdown('model', mtd_start)
+            by_channel = self.breakdown('channel', mtd_start)
+            top = self.top_sessions(mtd_start)
+
+        # Burn rate over the last day smooths out bursty sessions
+        burn_per_hour = last_day / 24
+        exhausted = self.forecast(mtd, burn_per_hour, now)
+        return {
+            'lastHour': last_hour,
+            'last24h': last_day,
+            'monthToDate': mtd,
+            'quota': self.quota,
+            'quotaPercent': min(mtd / self.quota * 100, 100) if self.quota else 0,
+            'burnPerHour': round(burn_per_hour),
+            'exhaustsAt': round(exhausted * 1000) if exhausted is not None else None,
+            'byModel': by_model,
+            'byChannel': by_channel,
+            'topSessions': top,
+        }
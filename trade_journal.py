@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Parser for the trade journal (memory/trades.md)
+
+The journal is a sequence of blocks:
+
+    ## OPEN: BTC LONG
+    - **Strategy:** RSI
+    - **Size:** 0.01
+    - **Entry:** $67000
+    - **Stop Loss:** $65000
+    - **Take Profit:** $70000
+
+    ## UPDATE: BTC LONG
+    - **Stop Loss:** $66500
+
+    ## CLOSED: BTC LONG
+    - **Exit:** $69000
+
+JournalParser is a line-at-a-time state machine that turns lines into
+block records; PositionBook folds records into the open positions (an
+UPDATE changes the latest matching open position, a CLOSED removes the
+oldest). iter_positions() streams a file through both, and TradesJournal
+keeps the parse incremental across refreshes of an append-mostly file.
+api.py and generate_data.py both parse through this module.
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+
+HEADER_RE = re.compile(r'## (OPEN|CLOSED|UPDATE): (\w+)(?: (LONG|SHORT))?')
+FIELD_RE = re.compile(r'\s*[-*]?\s*\*\*([^*]+?):\*\*\s*(.*?)\s*$')
+NUMBER_RE = re.compile(r'[-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)')
+
+# Appends at least this big are read through mmap instead of a plain read()
+MMAP_THRESHOLD = 1024 * 1024
+# Bytes kept from the start of the file and from just before the parse
+# offset, to tell an append from an in-place rewrite
+ANCHOR_BYTES = 64
+
+def parse_number(value):
+    """First number in value ('$67,000.5' -> 67000.5), or None"""
+    match = NUMBER_RE.search(value)
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(',', ''))
+    except ValueError:
+        return None
+
+# Journal field label -> (position key, parser)
+FIELDS = {
+    'Strategy': ('strategy', str),
+    'Size': ('size', parse_number),
+    'Entry': ('entry', parse_number),
+    'Stop Loss': ('sl', parse_number),
+    'Take Profit': ('tp', parse_number),
+    'Exit': ('exit', parse_number),
+}
+
+def new_position(coin, direction):
+    """Position with every field at its default"""
+    return {
+        'coin': coin,
+        'direction': direction,
+        'size': 0,
+        'entry': 0,
+        'sl': 0,
+        'tp': 0,
+        'strategy': 'Unknown',
+        'pnl': 0,
+        'pnlPercent': 0
+    }
+
+class JournalParser:
+    """Turns journal lines into block records.
+
+    A record is {'kind': 'OPEN' | 'CLOSED' | 'UPDATE', 'coin', 'direction',
+    'fields': {position key: value}}. A block ends at the next '#' heading.
+    """
+
+    def __init__(self):
+        self.block = None
+
+    def copy(self):
+        """Independent parser in the same state"""
+        other = JournalParser()
+        if self.block is not None:
+            other.block = {**self.block, 'fields': dict(self.block['fields'])}
+        return other
+
+    def feed(self, line):
+        """Consume one line (without its newline); returns a finished record or None"""
+        if line.startswith('#'):
+            finished = self.block
+            match = HEADER_RE.match(line)
+            if match:
+                kind, coin, direction = match.groups()
+                self.block = {'kind': kind, 'coin': coin, 'direction': direction, 'fields': {}}
+            else:
+                # Any other heading ends the block
+                self.block = None
+            return finished
+
+        if self.block is not None and '**' in line:
+            match = FIELD_RE.match(line)
+            if match and match.group(1) in FIELDS:
+                key, parse = FIELDS[match.group(1)]
+                value = parse(match.group(2))
+                if value is not None:
+                    self.block['fields'][key] = value
+        return None
+
+    def finish(self):
+        """The block still open at end of input, if any"""
+        finished, self.block = self.block, None
+        return finished
+
+class PositionBook:
+    """Open positions built from block records.
+
+    Open positions are kept in open order with a queue of them per coin
+    and side, so an UPDATE or CLOSED finds its position without scanning
+    every open one. Position dicts are never modified once stored (an
+    UPDATE swaps in a new dict), so the positions list is a safe snapshot.
+    """
+
+    def __init__(self):
+        # id -> position, in the order they were opened
+        self.open = {}
+        # (coin, direction) -> ids of its open positions, oldest first
+        self.queues = {}
+        self.next_id = 0
+
+    def copy(self):
+        other = PositionBook()
+        other.open = dict(self.open)
+        other.queues = {key: deque(ids) for key, ids in self.queues.items()}
+        other.next_id = self.next_id
+        return other
+
+    @property
+    def positions(self):
+        return list(self.open.values())
+
+    def find(self, record, latest):
+        """Key of the queue holding the latest/oldest position the record refers to"""
+        directions = [record['direction']] if record['direction'] else ['LONG', 'SHORT']
+        keys = [(record['coin'], d) for d in directions if (record['coin'], d) in self.queues]
+        if not keys:
+            return None
+        if latest:
+            return max(keys, key=lambda key: self.queues[key][-1])
+        return min(keys, key=lambda key: self.queues[key][0])
+
+    def preview(self, record):
+        """The positions list as it would be with record applied, leaving the book as is"""
+        kind = record['kind']
+        if kind == 'OPEN' and record['direction'] is not None:
+            position = new_position(record['coin'], record['direction'])
+            position.update((k, v) for k, v in record['fields'].items() if k in position)
+            position['id'] = self.next_id
+            return self.positions + [position]
+        key = self.find(record, latest=kind == 'UPDATE') if kind != 'OPEN' else None
+        if key is None:
+            return self.positions
+        if kind == 'UPDATE':
+            target = self.queues[key][-1]
+            fields = {k: v for k, v in record['fields'].items() if k in self.open[target]}
+            return [{**p, **fields} if i == target else p for i, p in self.open.items()]
+        target = self.queues[key][0]
+        return [p for i, p in self.open.items() if i != target]
+
+    def apply(self, record):
+        kind = record['kind']
+        if kind == 'OPEN':
+            if record['direction'] is None:
+                # Same as before UPDATE/CLOSED existed: no side, no position
+                return
+            position = new_position(record['coin'], record['direction'])
+            position.update((k, v) for k, v in record['fields'].items() if k in position)
+            # Ids count OPEN blocks from the top of the journal, so a
+            # re-parse gives every position the same id again
+            position['id'] = self.next_id
+            self.open[self.next_id] = position
+            self.queues.setdefault((record['coin'], record['direction']), deque()).append(self.next_id)
+            self.next_id += 1
+        elif kind == 'UPDATE':
+            key = self.find(record, latest=True)
+            if key is not None:
+                i = self.queues[key][-1]
+                fields = {k: v for k, v in record['fields'].items() if k in self.open[i]}
+                self.open[i] = {**self.open[i], **fields}
+        elif kind == 'CLOSED':
+            key = self.find(record, latest=False)
+            if key is not None:
+                del self.open[self.queues[key].popleft()]
+                if not self.queues[key]:
+                    del self.queues[key]
+
+def iter_records(lines):
+    """Block records from an iterable of lines (e.g. an open text file)"""
+    parser = JournalParser()
+    for line in lines:
+        record = parser.feed(line.rstrip('\r\n'))
+        if record is not None:
+            yield record
+    record = parser.finish()
+    if record is not None:
+        yield record
+
+def iter_positions(lines):
+    """Open positions at the end of the journal, streaming it line by line"""
+    book = PositionBook()
+    for record in iter_records(lines):
+        book.apply(record)
+    yield from book.open.values()
+
+class TradesJournal:
+    """Incrementally parsed view of memory/trades.md.
+
+    trades.md is an append-mostly journal, so only the bytes appended since
+    the last refresh are parsed. The file is re-parsed from scratch only when
+    it has been replaced, truncated or rewritten in place, and a refresh of
+    an unchanged file costs a single stat call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        """Forget everything parsed so far"""
+        self.stat_key = None
+        self.identity = None
+        self.offset = 0
+        self.head = b''
+        self.tail = b''
+        self.partial = b''
+        self.parser = JournalParser()
+        self.book = PositionBook()
+        self.snapshot = []
+
+    def refresh(self):
+        """Bring the parse up to date and return the open positions.
+
+        The returned list is shared between calls while the file is
+        unchanged, so callers must not modify it.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return self.snapshot
+
+        stat_key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if stat_key == self.stat_key:
+            return self.snapshot
+
+        with open(self.path, 'rb') as f:
+            if not self._is_append(f, st):
+                self.reset()
+                self.identity = (st.st_dev, st.st_ino)
+            self.partial = b''
+            if st.st_size > self.offset:
+                self._parse_appended(f, st.st_size)
+
+        self.stat_key = stat_key
+        # The unterminated last line and the block still being written are
+        # only previewed, so the next refresh can apply them for real
+        parser = self.parser
+        book = self.book
+        if self.partial:
+            parser = parser.copy()
+            line = self.partial.decode('utf-8', errors='ignore').rstrip('\r')
+            record = parser.feed(line)
+            if record is not None:
+                # The partial line starts a new block and finishes this one
+                book = book.copy()
+                book.apply(record)
+        if parser.block is not None:
+            self.snapshot = book.preview(parser.block)
+        else:
+            self.snapshot = book.positions
+        return self.snapshot
+
+    def _is_append(self, f, st):
+        """True if the file only grew since the last refresh"""
+        if self.identity != (st.st_dev, st.st_ino) or st.st_size < self.offset:
+            return False
+        f.seek(0)
+        if f.read(len(self.head)) != self.head:
+            return False
+        f.seek(self.offset - len(self.tail))
+        return f.read(len(self.tail)) == self.tail
+
+    def _parse_appended(self, f, size):
+        """Parse the complete lines between the saved offset and size"""
+        if size - self.offset >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                consumed = self._feed(buf, self.offset, size)
+                self.partial = buf[consumed:size]
+        else:
+            f.seek(self.offset)
+            buf = f.read(size - self.offset)
+            end = self._feed(buf, 0, len(buf))
+            consumed = self.offset + end
+            self.partial = buf[end:]
+
+        # A trailing partial line is only parsed provisionally (see refresh)
+        # and is read again once its newline has been written
+        if consumed > self.offset:
+            self.offset = consumed
+            f.seek(0)
+            self.head = f.read(min(ANCHOR_BYTES, consumed))
+            f.seek(max(0, consumed - ANCHOR_BYTES))
+            self.tail = f.read(consumed - max(0, consumed - ANCHOR_BYTES))
+
+    def _feed(self, buf, start, end):
+        """Apply every complete line in buf[start:end]; returns the end of the last one"""
+        parser, book = self.parser, self.book
+        pos = start
+        while pos < end:
+            newline = buf.find(b'\n', pos, end)
+            if newline < 0:
+                break
+            record = parser.feed(buf[pos:newline].decode('utf-8', errors='ignore').rstrip('\r'))
+            if record is not None:
+                book.apply(record)
+            pos = newline + 1
+        return pos
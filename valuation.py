@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Marks open positions to market
+
+revalue() computes mark price, P&L, P&L %, distance to stop loss and
+take profit, and notional for every position in one vectorized NumPy
+pass, so it stays cheap with thousands of positions. Without NumPy the
+same arithmetic runs in a plain loop.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def _outputs(mark, pnl, pnl_pct, sl_dist, tp_dist, notional):
+    """Fields added to a position; None where there is no price or level"""
+    def clean(value, digits):
+        return round(float(value), digits) if value is not None and math.isfinite(value) else None
+    return {
+        'markPrice': clean(mark, 8),
+        'pnl': clean(pnl, 2) or 0,
+        'pnlPercent': clean(pnl_pct, 2) or 0,
+        'slDistancePercent': clean(sl_dist, 2),
+        'tpDistancePercent': clean(tp_dist, 2),
+        'notional': clean(notional, 2),
+    }
+
+def _revalue_numpy(positions, prices):
+    n = len(positions)
+    # One pass over the dicts to build the input columns
+    columns = np.array([
+        (p.get('entry') or 0, p.get('size') or 0, p.get('sl') or 0, p.get('tp') or 0,
+         prices.get(p['coin'], np.nan), -1.0 if p['direction'] == 'SHORT' else 1.0)
+        for p in positions
+    ], dtype=float).reshape(n, 6)
+    # side is +1 for longs, -1 for shorts: every formula below is then the long one
+    entry, size, sl, tp, mark, side = columns.T
+    # A zero or negative mid is a bad quote, not a price
+    mark = np.where(mark > 0, mark, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        move = side * (mark - entry)
+        outputs = np.stack([
+            mark,
+            move * size,
+            np.where(entry > 0, move / entry * 100, np.nan),
+            # Room left before the stop is hit / move still needed to reach
+            # the target, as a % of the mark; negative once a level is crossed
+            np.where(sl > 0, side * (mark - sl) / mark * 100, np.nan),
+            np.where(tp > 0, side * (tp - mark) / mark * 100, np.nan),
+            size * mark,
+        ], axis=1)
+    outputs[~np.isfinite(outputs)] = np.nan
+    outputs[:, 1:] = np.round(outputs[:, 1:], 2)
+    outputs[:, 0] = np.round(outputs[:, 0], 8)
+
+    revalued = []
+    for p, (mark, pnl, pnl_pct, sl_dist, tp_dist, notional) in zip(positions, outputs.tolist()):
+        # NaN != NaN marks a missing price or level
+        revalued.append({
+            **p,
+            'markPrice': mark if mark == mark else None,
+            'pnl': pnl if pnl == pnl else 0,
+            'pnlPercent': pnl_pct if pnl_pct == pnl_pct else 0,
+            'slDistancePercent': sl_dist if sl_dist == sl_dist else None,
+            'tpDistancePercent': tp_dist if tp_dist == tp_dist else None,
+            'notional': notional if notional == notional else None,
+        })
+    return revalued
+
+def _revalue_python(positions, prices):
+    revalued = []
+    for p in positions:
+        entry, size = p.get('entry') or 0, p.get('size') or 0
+        sl, tp = p.get('sl') or 0, p.get('tp') or 0
+        mark = prices.get(p['coin'])
+        side = -1 if p['direction'] == 'SHORT' else 1
+        if mark is None or mark <= 0:
+            revalued.append({**p, **_outputs(None, None, None, None, None, None)})
+            continue
+        move = side * (mark - entry)
+        revalued.append({**p, **_outputs(
+            mark,
+            move * size,
+            move / entry * 100 if entry > 0 else None,
+            side * (mark - sl) / mark * 100 if sl > 0 else None,
+            side * (tp - mark) / mark * 100 if tp > 0 else None,
+            size * mark,
+        )})
+    return revalued
+
+def revalue(positions, prices):
+    """New position dicts marked to the given {coin: price} mids.
+
+    Positions without a price keep a P&L of 0 and get None for the
+    price-dependent fields. The input dicts are not modified.
+    """
+    if not positions:
+        return []
+    if np is not None:
+        return _revalue_numpy(positions, prices)
+    return _revalue_python(positions, prices)
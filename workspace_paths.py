@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Where things live in the OpenClaw workspace
+
+Shared by generate_data.py, api_collectors.py and the maintenance
+scripts, so a path is only spelled out once. Each helper takes the
+workspace root, so callers that point at another workspace (tests,
+benchmarks) keep working.
+"""
+
+import os
+
+WORKSPACE = r"C:\Users\kanaw\.openclaw\workspace"
+
+def trades_path(workspace=WORKSPACE):
+    """Path of the trade journal"""
+    return os.path.join(workspace, "memory", "trades.md")
+
+def clip_empire_db_path(workspace=WORKSPACE):
+    """Path of the Clip Empire SQLite DB"""
+    return os.path.join(workspace, 'ventures', 'clip_empire', 'data', 'clip_empire.db')
+
+def youtube_quota_path(workspace=WORKSPACE):
+    """Path of the file the clip engine writes its YouTube quota usage to"""
+    return os.path.join(workspace, 'ventures', 'clip_engine', 'youtube_quota.txt')
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+inotify-backed watcher for the OpenClaw workspace (Linux only)
+
+Follows the whole workspace tree through ctypes calls into libc, so there
+is no extra dependency. Instead of polling, the collector daemon asks the
+watcher which directories changed since it last looked and only re-scans
+those; sections such as positions are only marked dirty when a path they
+depend on actually changes. The watcher also keeps a bounded feed of the
+most recently modified files for the dashboard.
+
+On other platforms available() is False and the daemon keeps polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from folder_index import SKIP_DIRS
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# How many distinct files the "recently modified" feed remembers
+RECENT_FILES = 50
+
+_libc = None
+
+def _load_libc():
+    """libc with the inotify calls, or None where inotify doesn't exist"""
+    global _libc
+    if _libc is None and sys.platform.startswith('linux'):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            _libc = libc
+        except (OSError, AttributeError):
+            _libc = None
+    return _libc
+
+def available():
+    """True if inotify can be used on this machine"""
+    return _load_libc() is not None
+
+class WorkspaceWatcher:
+    """Watches every directory under root and records what changed.
+
+    sections maps a section name to the paths it depends on; a change to
+    any of those paths (or anything below them) marks the section dirty.
+    Every change marks the 'folders' section dirty.
+    """
+
+    def __init__(self, root, sections=None):
+        self.root = os.path.normpath(root)
+        self.sections = {name: [os.path.normpath(p) for p in paths]
+                         for name, paths in (sections or {}).items()}
+        self.lock = threading.Lock()
+        self.dirty_dirs = set()
+        self.dirty_sections = set()
+        self.overflowed = False
+        self.recent = OrderedDict()
+        # Paths whose feed entry changed since recent_files() last read it
+        self.unflushed = set()
+        self.watches = {}
+        self.fd = None
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        """Add watches for the whole tree and start the reader thread"""
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watch_tree(self.root)
+        # Everything needs its first refresh
+        self.dirty_sections.update(self.sections)
+        self.dirty_sections.add('folders')
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='workspace-watcher', daemon=True)
+        self.thread.start()
+        print(f"[OK] Watching {len(self.watches)} directories under {self.root}")
+
+    def stop(self):
+        """Stop the reader thread and release the inotify descriptor"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def watch_tree(self, top):
+        """Add a watch on top and every directory below it"""
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                # Usually fs.inotify.max_user_watches; changes there are missed
+                # until the next full refresh, so force one
+                print(f"[WARN] Could not watch {path}: {os.strerror(ctypes.get_errno())}")
+                self.overflowed = True
+                continue
+            self.watches[wd] = path
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.name not in SKIP_DIRS and entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except OSError:
+                pass
+
+    def unwatch_tree(self, top):
+        """Drop the watches of top and everything below it (it moved away)"""
+        prefix = top + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == top or path.startswith(prefix):
+                _libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def run(self):
+        """Reader loop; wakes at least once a second so stop() is prompt"""
+        while self.running:
+            try:
+                ready, _, _ = select.select([self.fd], [], [], 1.0)
+                if not ready:
+                    continue
+                data = os.read(self.fd, 64 * 1024)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError as e:
+                print(f"[WARN] Workspace watcher stopped: {e}")
+                break
+            self.handle(data)
+
+    def handle(self, data):
+        """Apply a buffer of raw inotify events"""
+        now_ms = int(time.time() * 1000)
+        offset = 0
+        with self.lock:
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    self.dirty_sections.update(self.sections)
+                    self.dirty_sections.add('folders')
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_DELETE_SELF:
+                    self.mark(directory)
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if os.path.basename(path) in SKIP_DIRS:
+                        continue
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.watch_tree(path)
+                    elif mask & IN_MOVED_FROM:
+                        self.unwatch_tree(path)
+                else:
+                    self.note_file(path, mask, now_ms)
+                self.mark(directory, path)
+
+    def mark(self, directory, path=None):
+        """Record that directory (and possibly path inside it) changed"""
+        self.dirty_dirs.add(directory)
+        self.dirty_sections.add('folders')
+        changed = path or directory
+        for section, paths in self.sections.items():
+            for watched in paths:
+                if changed == watched or changed.startswith(watched + os.sep) or watched.startswith(changed + os.sep):
+                    self.dirty_sections.add(section)
+                    break
+
+    def note_file(self, path, mask, now_ms):
+        """Add a file event to the bounded recently-modified feed.
+
+        Until the feed is next read, a plain write doesn't hide a stronger
+        event for the same path, so a new file that is then written to
+        shows as created rather than modified.
+        """
+        if mask & IN_CREATE:
+            event = 'created'
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            event = 'deleted'
+        elif mask & IN_MOVED_TO:
+            event = 'moved'
+        else:
+            event = 'modified'
+
+        previous = self.recent.pop(path, None)
+        if event == 'modified' and previous is not None and path in self.unflushed:
+            event = previous['event']
+        self.recent[path] = {'path': os.path.relpath(path, self.root), 'event': event, 'at': now_ms}
+        self.unflushed.add(path)
+        while len(self.recent) > RECENT_FILES:
+            dropped, _ = self.recent.popitem(last=False)
+            self.unflushed.discard(dropped)
+
+    def is_dirty(self, section):
+        """True if section has pending changes (does not clear them)"""
+        with self.lock:
+            return section in self.dirty_sections
+
+    def take_dirty(self, section):
+        """Clear and return whether section had pending changes"""
+        with self.lock:
+            if section in self.dirty_sections:
+                self.dirty_sections.discard(section)
+                return True
+            return False
+
+    def take_dirty_dirs(self):
+        """Clear and return (changed directories, whether a full refresh is needed)"""
+        with self.lock:
+            dirs, overflowed = self.dirty_dirs, self.overflowed
+            self.dirty_dirs = set()
+            self.overflowed = False
+            return dirs, overflowed
+
+    def recent_files(self):
+        """Most recently modified files, newest first"""
+        with self.lock:
+            self.unflushed.clear()
+            return [dict(entry) for entry in reversed(self.recent.values())]